@@ -0,0 +1,43 @@
+# cython: language_level=3, boundscheck=False
+"""
+Per-chunk index entry construction for build_vector_index.py.
+Kept free of I/O and C-extension state so it runs unchanged under PyPy and
+can be compiled in place with `cythonize -i _index_builder.py`.
+"""
+
+import re
+from typing import Any, Dict
+
+# Translation table turning file-name underscores into URL dashes
+UNDERSCORE_TO_DASH = str.maketrans("_", "-")
+
+# Captures the URL path from test_data/.../en_docs_<path>.<ext> source files
+DOCS_SOURCE_PATTERN = re.compile(r"test_data/(?:.*/)?en_docs_([^/]*?)(?:\.[^./]*)?")
+
+def build_entry(chunk: Dict[str, Any], now_iso: str) -> Dict[str, Any]:
+    """Build one vector index entry from a processed chunk without mutating it."""
+    # Copy metadata once so the loaded chunks are never mutated
+    chunk_metadata = chunk["metadata"]
+    metadata = dict(chunk_metadata)
+    
+    # Add additional metadata for search
+    source_file = chunk_metadata.get("source_file")
+    if source_file and source_file.startswith("test_data/"):
+        # Convert file name to approximate URL
+        docs_match = DOCS_SOURCE_PATTERN.fullmatch(source_file)
+        if docs_match:
+            url_path = docs_match.group(1).translate(UNDERSCORE_TO_DASH)
+            metadata["source_url"] = f"https://docs.anthropic.com/en/docs/{url_path}"
+        
+        # Add scraped_at timestamp
+        metadata["scraped_at"] = now_iso
+    
+    # Add parent title if not present
+    if "parent_title" not in metadata:
+        metadata["parent_title"] = chunk_metadata.get("doc_title", "Unknown")
+    
+    return {
+        "chunk_id": chunk["chunk_id"],
+        "content": chunk["content"],
+        "metadata": metadata
+    }
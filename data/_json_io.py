@@ -0,0 +1,25 @@
+"""
+JSON encoding and decoding shared by the data/ scripts.
+Uses orjson when it is installed and the stdlib json module otherwise.
+"""
+
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def parse_json(data: bytes) -> Any:
+    """Parse JSON from raw bytes."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def encode_json(obj: Any, indent: bool = False) -> bytes:
+    """Serialize an object as UTF-8 JSON, compact on one line or indented by two spaces."""
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+        return orjson.dumps(obj, option=option)
+    return json.dumps(obj, indent=2 if indent else None, ensure_ascii=False).encode('utf-8')
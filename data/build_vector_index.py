@@ -5,149 +5,309 @@ This script creates the searchable vector database with embeddings.
 """
 
 import os
-import json
 import sys
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Union
 import hashlib
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
+try:
+    import msgpack
+except ImportError:
+    # Optional; without it only the JSON index is written
+    msgpack = None
+
+try:
+    import liburing
+except ImportError:
+    # Optional Linux io_uring bindings; chunk reads use a thread pool without them
+    liburing = None
+
+try:
+    from datasketch import MinHash, MinHashLSH
+except ImportError:
+    # Optional; only needed for near-duplicate detection
+    MinHash = MinHashLSH = None
+
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent / "vector-server" / "src"))
 
+from _index_builder import build_entry
+from _json_io import encode_json, parse_json
+
+# Buffer size for streamed reads/writes; per-call overhead levels off well below this
+IO_BUFFER_SIZE = 1 << 20
+
+# Number of chunk file reads submitted to io_uring per batch
+URING_QUEUE_DEPTH = 64
+
+# Permutations per MinHash signature for near-duplicate detection
+MINHASH_NUM_PERM = 128
+
+def read_json(path: Union[str, Path]) -> Any:
+    """Parse a JSON file from raw bytes."""
+    with open(path, 'rb') as f:
+        return parse_json(f.read())
+
+def write_bytes_preallocated(path: Path, data: bytes):
+    """Write bytes with raw os.write calls after reserving the exact file size."""
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        if data and hasattr(os, "posix_fallocate"):
+            try:
+                os.posix_fallocate(fd, 0, len(data))
+            except OSError:
+                # Not every filesystem supports preallocation; the write still works
+                pass
+        view = memoryview(data)
+        while view:
+            written = os.write(fd, view)
+            view = view[written:]
+    finally:
+        os.close(fd)
+
+def write_json(path: Path, obj: Any):
+    """Atomically write an object as indented UTF-8 JSON."""
+    tmp_path = path.with_name(path.name + ".tmp")
+    write_bytes_preallocated(tmp_path, encode_json(obj, indent=True))
+    os.replace(tmp_path, path)
+
+def write_msgpack(path: Path, obj: Any):
+    """Atomically write an object as MessagePack."""
+    tmp_path = path.with_name(path.name + ".tmp")
+    write_bytes_preallocated(tmp_path, msgpack.packb(obj, use_bin_type=True))
+    os.replace(tmp_path, path)
+
+def write_json_array(path: Path, items: Iterable[Any]):
+    """Atomically stream a JSON array to disk one element per line, never holding the whole document."""
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, 'wb', buffering=IO_BUFFER_SIZE) as f:
+        f.write(b"[")
+        separator = b"\n"
+        for item in items:
+            f.write(separator)
+            f.write(encode_json(item))
+            separator = b",\n"
+        f.write(b"\n]\n")
+    os.replace(tmp_path, path)
+
+def read_files_uring(paths: List[str]) -> List[bytearray]:
+    """Read whole files through io_uring, submitting one batch of reads per syscall."""
+    contents = []
+    ring = liburing.Ring()
+    cqe = liburing.Cqe()
+    liburing.io_uring_queue_init(URING_QUEUE_DEPTH, ring)
+    try:
+        for start in range(0, len(paths), URING_QUEUE_DEPTH):
+            batch = paths[start:start + URING_QUEUE_DEPTH]
+            fds = []
+            buffers = []
+            sizes = [0] * len(batch)
+            try:
+                for index, path in enumerate(batch):
+                    fd = os.open(path, os.O_RDONLY)
+                    fds.append(fd)
+                    buffer = bytearray(os.fstat(fd).st_size)
+                    buffers.append(buffer)
+                    sqe = liburing.io_uring_get_sqe(ring)
+                    liburing.io_uring_prep_read(sqe, fd, buffer, 0)
+                    liburing.io_uring_sqe_set_data64(sqe, index)
+                liburing.io_uring_submit(ring)
+                
+                # Completions arrive in any order; user_data maps them back
+                for _ in batch:
+                    liburing.io_uring_wait_cqe(ring, cqe)
+                    completion = cqe[0]
+                    index = completion.user_data
+                    result = completion.res
+                    liburing.io_uring_cqe_seen(ring, completion)
+                    sizes[index] = liburing.trap_error(result)
+            finally:
+                for fd in fds:
+                    os.close(fd)
+            
+            for buffer, size in zip(buffers, sizes):
+                contents.append(buffer if size == len(buffer) else buffer[:size])
+    finally:
+        liburing.io_uring_queue_exit(ring)
+    return contents
+
+def load_shards(chunks_dir: Path) -> Iterator[Dict[str, Any]]:
+    """Yield chunks from consolidated shard_*.jsonl files (one chunk per line)."""
+    for shard_file in sorted(chunks_dir.glob("shard_*.jsonl")):
+        with open(shard_file, 'rb', buffering=IO_BUFFER_SIZE) as f:
+            for line in f:
+                if line.strip():
+                    yield parse_json(line)
+
 def load_processed_chunks(chunks_dir: Path) -> List[Dict[str, Any]]:
     """Load all processed chunks from the chunks directory."""
-    all_chunks = []
+    # Prefer consolidated shards; fall back to one JSON file per chunk
+    if any(chunks_dir.glob("shard_*.jsonl")):
+        return list(load_shards(chunks_dir))
     
-    # Iterate through each file's chunk directory
-    for file_dir in sorted(chunks_dir.iterdir()):
-        if file_dir.is_dir():
-            # Load all chunks for this file
-            for chunk_file in sorted(file_dir.glob("chunk_*.json")):
-                with open(chunk_file, 'r', encoding='utf-8') as f:
-                    chunk = json.load(f)
-                    all_chunks.append(chunk)
+    # Collect chunk files for each file's chunk directory in a stable order;
+    # scandir entries carry their file type, so no extra stat() per entry
+    with os.scandir(chunks_dir) as entries:
+        file_dirs = sorted(e.path for e in entries if e.is_dir(follow_symlinks=False))
     
-    return all_chunks
-
-def build_vector_index(chunks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-    """Build the vector database index from chunks."""
-    vector_index = []
+    chunk_files = []
+    for file_dir in file_dirs:
+        with os.scandir(file_dir) as entries:
+            chunk_files.extend(sorted(
+                e.path for e in entries
+                if e.name.startswith("chunk_") and e.name.endswith(".json")
+                and e.is_file(follow_symlinks=False)
+            ))
     
-    for chunk in chunks:
-        # Create index entry
-        entry = {
-            "chunk_id": chunk["chunk_id"],
-            "content": chunk["content"],
-            "metadata": chunk["metadata"]
-        }
-        
-        # Add additional metadata for search
-        if "source_file" in chunk["metadata"]:
-            # Extract source URL from file name if available
-            source_file = chunk["metadata"]["source_file"]
-            if source_file.startswith("test_data/"):
-                # Convert file name to approximate URL
-                file_name = Path(source_file).stem
-                if file_name.startswith("en_docs_"):
-                    url_path = file_name.replace("en_docs_", "").replace("_", "-")
-                    entry["metadata"]["source_url"] = f"https://docs.anthropic.com/en/docs/{url_path}"
-                
-                # Add scraped_at timestamp
-                entry["metadata"]["scraped_at"] = datetime.now().isoformat()
-        
-        # Add parent title if not present
-        if "parent_title" not in entry["metadata"]:
-            entry["metadata"]["parent_title"] = entry["metadata"].get("doc_title", "Unknown")
-        
-        vector_index.append(entry)
+    # Batch the reads through io_uring on Linux when the bindings are installed
+    if liburing is not None and sys.platform.startswith("linux"):
+        try:
+            return [parse_json(data) for data in read_files_uring(chunk_files)]
+        except OSError:
+            # io_uring can be unavailable (old kernel, seccomp); use the thread pool
+            pass
     
-    return vector_index
+    # Reads are I/O bound, so fan them out across threads; map keeps the order
+    max_workers = min(32, (os.cpu_count() or 1) * 4)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(read_json, chunk_files))
+
+def drop_duplicate_chunks(chunks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Keep the first of any chunks with identical content, preserving order."""
+    seen_contents = {}
+    unique_chunks = []
+    for chunk in chunks:
+        # Equal content hashes to the same id; compare content too in case of a short-hash collision
+        chunk_id = chunk["chunk_id"]
+        if seen_contents.get(chunk_id) == chunk["content"]:
+            continue
+        seen_contents.setdefault(chunk_id, chunk["content"])
+        unique_chunks.append(chunk)
+    return unique_chunks
+
+def drop_near_duplicate_chunks(chunks: List[Dict[str, Any]], threshold: float) -> List[Dict[str, Any]]:
+    """Keep the first of any chunks whose word sets are at least threshold similar, preserving order."""
+    # LSH buckets MinHash signatures, so each chunk is only compared against likely matches
+    lsh = MinHashLSH(threshold=threshold, num_perm=MINHASH_NUM_PERM)
+    unique_chunks = []
+    for i, chunk in enumerate(chunks):
+        signature = MinHash(num_perm=MINHASH_NUM_PERM)
+        signature.update_batch([word.encode("utf-8") for word in set(chunk["content"].split())])
+        if lsh.query(signature):
+            continue
+        lsh.insert(i, signature)
+        unique_chunks.append(chunk)
+    return unique_chunks
+
+def build_vector_index(chunks: List[Dict[str, Any]], now_iso: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Build the vector database index from chunks."""
+    if now_iso is None:
+        now_iso = datetime.now().isoformat()
+    # The per-chunk work lives in _index_builder (PyPy-friendly, optionally Cython-compiled)
+    return [build_entry(chunk, now_iso) for chunk in chunks]
 
 def create_empty_embeddings(num_chunks: int, embedding_dim: int = 384) -> List[List[float]]:
     """Create placeholder embeddings (will be generated on first use)."""
     # Return empty list - embeddings will be generated when needed
     return []
 
-def update_database_files(vector_db_dir: Path, vector_index: List[Dict[str, Any]]):
-    """Update all vector database files with the new index."""
+def update_database_files(vector_db_dir: Path, vector_index: List[Dict[str, Any]], now_iso: Optional[str] = None) -> Dict[str, Any]:
+    """Update all vector database files with the new index and return the collected summary."""
+    if now_iso is None:
+        now_iso = datetime.now().isoformat()
     
-    # 1. Update vector_db_index.json
+    # 1. vector_db_index.json and 2. chunks/chunks.json
     index_file = vector_db_dir / "vector_db_index.json"
-    with open(index_file, 'w', encoding='utf-8') as f:
-        json.dump(vector_index, f, indent=2, ensure_ascii=False)
-    print(f"   ✅ Updated vector_db_index.json ({len(vector_index)} entries)")
-    
-    # 2. Update chunks/chunks.json
     chunks_file = vector_db_dir / "chunks" / "chunks.json"
-    chunks_data = [
-        {
-            "id": entry["chunk_id"],
-            "content": entry["content"],
-            "metadata": entry["metadata"]
+    categories = set()
+    sources = set()
+    
+    def chunks_data():
+        # Collect categories and sources in the same pass that writes chunks.json
+        for entry in vector_index:
+            entry_metadata = entry["metadata"]
+            categories.add(entry_metadata.get("category", "general"))
+            source_file = entry_metadata.get("source_file")
+            if source_file:
+                sources.add(source_file)
+            yield {
+                "id": entry["chunk_id"],
+                "content": entry["content"],
+                "metadata": entry_metadata
+            }
+    
+    # The database files are independent, so write them concurrently
+    with ThreadPoolExecutor(max_workers=6) as executor:
+        index_write = executor.submit(write_json_array, index_file, vector_index)
+        executor.submit(write_json_array, chunks_file, chunks_data()).result()
+        
+        # 3. metadata/metadata.json (needs the categories gathered above)
+        metadata = {
+            "total_chunks": len(vector_index),
+            "categories": list(categories),
+            "sources": list(sources),
+            "last_updated": now_iso,
+            "version": "1.0.0"
         }
-        for entry in vector_index
-    ]
-    with open(chunks_file, 'w', encoding='utf-8') as f:
-        json.dump(chunks_data, f, indent=2, ensure_ascii=False)
+        
+        # 4. indices/semantic_index.json
+        semantic_index = {
+            "version": "1.0.0",
+            "embedding_model": "sentence-transformers/all-MiniLM-L6-v2",
+            "embedding_dim": 384,
+            "total_vectors": len(vector_index),
+            "categories": metadata["categories"],
+            "last_built": now_iso
+        }
+        
+        # 5. status.json
+        status = {
+            "status": "populated",
+            "initialized_at": now_iso,
+            "version": "1.0.0",
+            "total_chunks": len(vector_index),
+            "total_observations": 0,
+            "last_updated": now_iso
+        }
+        
+        # 6. config/database.json
+        config = {
+            "version": "1.0.0",
+            "embedding_model": "sentence-transformers/all-MiniLM-L6-v2",
+            "chunk_size": 1000,
+            "overlap": 100,
+            "vector_dim": 384,
+            "similarity_metric": "cosine",
+            "index_type": "flat",
+            "created_at": now_iso
+        }
+        
+        small_files = [
+            (vector_db_dir / "metadata" / "metadata.json", metadata),
+            (vector_db_dir / "indices" / "semantic_index.json", semantic_index),
+            (vector_db_dir / "status.json", status),
+            (vector_db_dir / "config" / "database.json", config),
+        ]
+        small_writes = [executor.submit(write_json, path, obj) for path, obj in small_files]
+        index_write.result()
+        for write in small_writes:
+            write.result()
+    
+    print(f"   ✅ Updated vector_db_index.json ({len(vector_index)} entries)")
     print(f"   ✅ Updated chunks.json")
     
-    # 3. Update metadata/metadata.json
-    metadata_file = vector_db_dir / "metadata" / "metadata.json"
-    metadata = {
-        "total_chunks": len(vector_index),
-        "categories": list(set(e["metadata"].get("category", "general") for e in vector_index)),
-        "sources": list(set(e["metadata"].get("source_file", "") for e in vector_index if e["metadata"].get("source_file"))),
-        "last_updated": datetime.now().isoformat(),
-        "version": "1.0.0"
-    }
-    with open(metadata_file, 'w', encoding='utf-8') as f:
-        json.dump(metadata, f, indent=2)
-    print(f"   ✅ Updated metadata.json")
-    
-    # 4. Update indices/semantic_index.json
-    semantic_index_file = vector_db_dir / "indices" / "semantic_index.json"
-    semantic_index = {
-        "version": "1.0.0",
-        "embedding_model": "sentence-transformers/all-MiniLM-L6-v2",
-        "embedding_dim": 384,
-        "total_vectors": len(vector_index),
-        "categories": metadata["categories"],
-        "last_built": datetime.now().isoformat()
-    }
-    with open(semantic_index_file, 'w', encoding='utf-8') as f:
-        json.dump(semantic_index, f, indent=2)
-    print(f"   ✅ Updated semantic_index.json")
-    
-    # 5. Update status.json
-    status_file = vector_db_dir / "status.json"
-    status = {
-        "status": "populated",
-        "initialized_at": datetime.now().isoformat(),
-        "version": "1.0.0",
-        "total_chunks": len(vector_index),
-        "total_observations": 0,
-        "last_updated": datetime.now().isoformat()
-    }
-    with open(status_file, 'w', encoding='utf-8') as f:
-        json.dump(status, f, indent=2)
-    print(f"   ✅ Updated status.json")
-    
-    # 6. Update database config
-    config_file = vector_db_dir / "config" / "database.json"
-    config = {
-        "version": "1.0.0",
-        "embedding_model": "sentence-transformers/all-MiniLM-L6-v2",
-        "chunk_size": 1000,
-        "overlap": 100,
-        "vector_dim": 384,
-        "similarity_metric": "cosine",
-        "index_type": "flat",
-        "created_at": datetime.now().isoformat()
-    }
-    with open(config_file, 'w', encoding='utf-8') as f:
-        json.dump(config, f, indent=2)
-    print(f"   ✅ Updated database.json")
+    # Binary copy of the index so the server can skip JSON parsing on start-up;
+    # written after the JSON so the server can tell it is up to date by mtime
+    if msgpack is not None:
+        write_msgpack(vector_db_dir / "vector_db_index.msgpack", vector_index)
+        print(f"   ✅ Updated vector_db_index.msgpack")
+    
+    for path, _ in small_files:
+        print(f"   ✅ Updated {path.name}")
+    
+    return {"categories": categories, "sources": sources, "total": len(vector_index)}
 
 def main():
     """Main function to build vector database index."""
@@ -174,9 +334,34 @@ def main():
         print("❌ No chunks to index")
         return False
     
+    # Shared navigation and footer sections repeat verbatim across pages; index them once
+    unique_chunks = drop_duplicate_chunks(chunks)
+    if len(unique_chunks) < len(chunks):
+        print(f"   ♻️ Skipped {len(chunks) - len(unique_chunks)} duplicate chunks")
+    chunks = unique_chunks
+    
+    # Optionally also skip near-identical chunks, e.g. NEAR_DUPLICATE_THRESHOLD=0.85
+    near_duplicate_threshold = os.getenv("NEAR_DUPLICATE_THRESHOLD")
+    if near_duplicate_threshold:
+        try:
+            threshold = float(near_duplicate_threshold)
+        except ValueError:
+            threshold = None
+        
+        if threshold is None or not 0 < threshold <= 1:
+            print(f"   ⚠️ NEAR_DUPLICATE_THRESHOLD={near_duplicate_threshold!r} is not a number in (0, 1]; keeping near-duplicates")
+        elif MinHashLSH is None:
+            print("   ⚠️ NEAR_DUPLICATE_THRESHOLD is set but datasketch is not installed; keeping near-duplicates")
+        else:
+            unique_chunks = drop_near_duplicate_chunks(chunks, threshold)
+            if len(unique_chunks) < len(chunks):
+                print(f"   ♻️ Skipped {len(chunks) - len(unique_chunks)} near-duplicate chunks")
+            chunks = unique_chunks
+    
     # Build vector index
     print("🔧 Building vector index...")
-    vector_index = build_vector_index(chunks)
+    now_iso = datetime.now().isoformat()
+    vector_index = build_vector_index(chunks, now_iso)
     print(f"   ✅ Built index with {len(vector_index)} entries")
     
     # Ensure vector database directories exist
@@ -189,20 +374,19 @@ def main():
     
     # Update all database files
     print("💾 Updating vector database files...")
-    update_database_files(vector_db_dir, vector_index)
+    summary = update_database_files(vector_db_dir, vector_index, now_iso)
     
     # Save a copy in processed_test_data for reference
     processed_index_file = processed_dir / "vector_db_index.json"
-    with open(processed_index_file, 'w', encoding='utf-8') as f:
-        json.dump(vector_index, f, indent=2, ensure_ascii=False)
+    write_json_array(processed_index_file, vector_index)
     print(f"   ✅ Saved reference copy to processed_test_data/")
     
     # Summary
     print("\n" + "=" * 50)
     print("✅ Vector Database Index Built Successfully!")
     print(f"📊 Summary:")
-    print(f"   • Total chunks indexed: {len(vector_index)}")
-    print(f"   • Categories: {', '.join(set(e['metadata'].get('category', 'general') for e in vector_index))}")
+    print(f"   • Total chunks indexed: {summary['total']}")
+    print(f"   • Categories: {', '.join(summary['categories'])}")
     print(f"   • Database location: {vector_db_dir}")
     print(f"   • Status: Ready for search!")
     
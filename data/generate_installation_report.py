@@ -4,20 +4,217 @@ Generate comprehensive installation report for Claude Complete Ecosystem.
 This script validates all components and creates a detailed status report.
 """
 
+import io
 import json
+import mmap
 import os
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from datetime import datetime
-from typing import Dict, Any, List
+from typing import BinaryIO, Dict, Any, List, Optional, Set, Tuple, Union
 
-def check_file_exists(file_path: Path) -> bool:
-    """Check if a file exists and is not empty."""
-    return file_path.exists() and file_path.stat().st_size > 0
+from _json_io import orjson, parse_json
 
-def check_directory_exists(dir_path: Path) -> bool:
+try:
+    import ijson
+except ImportError:
+    # ijson is optional; without it the index is parsed in full
+    ijson = None
+else:
+    # Pin the C yajl2 backend when it is built; the pure-Python one is much slower
+    try:
+        ijson = ijson.get_backend("yajl2_c")
+    except ImportError:
+        pass
+
+try:
+    import msgspec
+except ImportError:
+    # msgspec is optional; it decodes only the index fields the report needs
+    msgspec = None
+
+if msgspec is not None:
+    class IndexEntryMetadata(msgspec.Struct):
+        """The only metadata field the report reads from an index entry."""
+        category: Any = None
+
+    class IndexEntry(msgspec.Struct):
+        """Typed view of a vector index entry; other fields are skipped while decoding."""
+        metadata: Optional[IndexEntryMetadata] = None
+
+    INDEX_DECODER = msgspec.json.Decoder(List[IndexEntry])
+
+# Report labels indexed by a boolean check result: (False, True)
+YES_NO = ("❌ No", "✅ Yes")
+READY = ("❌ Not Ready", "✅ Ready")
+FOUND = ("❌ Not Found", "✅ Found")
+CONFIGURED = ("❌ Not Configured", "✅ Configured")
+OPTIONAL_CONFIGURED = ("⚠️ Not Configured (Optional)", "✅ Configured")
+AVAILABLE = ("❌ Missing", "✅ Available")
+IMPORTABLE = ("❌ Not Importable", "✅ Importable")
+INSTALLED_HEADING = ("NOT INSTALLED", "INSTALLED")
+CONFIGURED_HEADING = ("NOT CONFIGURED", "CONFIGURED")
+
+# Paths accepted by the filesystem helpers
+StrPath = Union[str, os.PathLike]
+
+# Read buffer for JSON config files
+JSON_READ_BUFFER_SIZE = 64 * 1024
+
+# Locations resolved once at import time
+SCRIPT_DIR = Path(__file__).parent
+PROJECT_ROOT = SCRIPT_DIR.parent
+HOME_DIR = Path.home()
+
+# Static next-step sections of the report
+READY_TO_USE_STEPS = """**Your ecosystem is ready to use!**
+
+1. Restart Claude Code to load the new configuration
+2. Test vector search with queries about Claude Code
+3. Let agents coordinate automatically on your projects
+4. Scrape additional documentation as needed
+
+### Quick Test Commands:
+```bash
+# Test vector search
+cd vector-server && source venv/bin/activate
+VECTOR_DB_PATH="../data/vector_db" python -c "from mcp_vector_server.simple_server import search_documentation; print(search_documentation('memory management'))"
+
+# Scrape new documentation
+cd doc-tools && source venv/bin/activate
+python SimpleDocScraper.py <url>
+```
+"""
+
+POPULATE_DATABASE_STEP = """1. **Populate Vector Database**:
+   ```bash
+   cd data
+   python process_test_data.py
+   python build_vector_index.py
+   ```
+
+"""
+
+INSTALL_AGENTS_STEP = """2. **Install Agent System**:
+   ```bash
+   cd agents
+   ./install.sh
+   ```
+
+"""
+
+CONFIGURE_MCP_STEP = """3. **Configure MCP Integration**:
+   - The installer should have created ~/.claude/claude_desktop_config.json
+   - Restart Claude Code after configuration
+
+"""
+
+def check_file_exists(file_path: StrPath) -> Optional[os.stat_result]:
+    """Check if a file exists and is not empty, returning its stat result or None."""
+    try:
+        file_stat = os.stat(file_path)
+    except (FileNotFoundError, NotADirectoryError):
+        return None
+    return file_stat if file_stat.st_size > 0 else None
+
+def check_directory_exists(dir_path: StrPath) -> bool:
     """Check if a directory exists and has content."""
-    return dir_path.exists() and any(dir_path.iterdir())
+    try:
+        with os.scandir(dir_path) as entries:
+            return next(entries, None) is not None
+    except (FileNotFoundError, NotADirectoryError):
+        return False
+
+def scan_directory(dir_path: StrPath) -> Dict[str, os.DirEntry]:
+    """List a directory once, returning its entries by name (empty if it is missing)."""
+    try:
+        with os.scandir(dir_path) as entries:
+            return {entry.name: entry for entry in entries}
+    except (FileNotFoundError, NotADirectoryError):
+        return {}
+
+def scan_claude_dir(home_dir: StrPath) -> Dict[str, os.DirEntry]:
+    """List ~/.claude, returning its entries by name."""
+    return scan_directory(os.path.join(home_dir, ".claude"))
+
+def entry_has_content(entry: Optional[os.DirEntry]) -> bool:
+    """Check if a scanned directory entry exists and is not empty."""
+    if entry is None:
+        return False
+    try:
+        return entry.stat().st_size > 0
+    except FileNotFoundError:
+        return False
+
+def count_markdown_files(dir_path: StrPath) -> int:
+    """Count the .md files in a directory without building Path objects."""
+    try:
+        with os.scandir(dir_path) as entries:
+            return sum(1 for entry in entries
+                       if entry.name.endswith(".md") and entry.is_file())
+    except (FileNotFoundError, NotADirectoryError):
+        return 0
+
+def read_json_file(file_path: StrPath) -> Any:
+    """Load a JSON file through an explicitly sized binary buffer."""
+    with io.BufferedReader(io.FileIO(file_path, 'r'), buffer_size=JSON_READ_BUFFER_SIZE) as f:
+        return parse_json(f.read())
+
+def read_past_whitespace(f: BinaryIO) -> bytes:
+    """Return the next non-whitespace byte of a binary file (b"" at the end), leaving the file just after it."""
+    while True:
+        block = f.read(64)
+        if not block:
+            return b""
+        rest = block.lstrip()
+        if rest:
+            f.seek(1 - len(rest), os.SEEK_CUR)
+            return rest[:1]
+
+def json_container_is_empty(file_path: StrPath) -> bool:
+    """Check whether a JSON file holds an empty array/object by peeking at its first tokens."""
+    with open(file_path, 'rb') as f:
+        first = read_past_whitespace(f)
+        if first in (b"[", b"{"):
+            return read_past_whitespace(f) in (b"]", b"}")
+    return not first
+
+def load_json_mmap(file_path: StrPath) -> Any:
+    """Load a non-empty JSON file, parsing a read-only memory map when orjson is available."""
+    with open(file_path, 'rb') as f:
+        if orjson is None:
+            return json.load(f)
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as view:
+            return orjson.loads(view)
+
+def scan_vector_index(index_file: StrPath) -> Tuple[int, Set[str]]:
+    """Count index entries and collect their categories without materializing the index."""
+    total_chunks = 0
+    categories = set()
+    if ijson is not None:
+        # Stream parse events so chunk contents are never built into Python objects
+        with open(index_file, 'rb') as f:
+            for prefix, event, value in ijson.parse(f):
+                if prefix == "item" and event == "start_map":
+                    total_chunks += 1
+                elif prefix == "item.metadata.category" and event == "string":
+                    categories.add(value)
+        return total_chunks, categories
+    
+    if msgspec is not None:
+        with open(index_file, 'rb') as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as view:
+                entries = INDEX_DECODER.decode(view)
+        for entry in entries:
+            if entry.metadata is not None and entry.metadata.category is not None:
+                categories.add(entry.metadata.category)
+        return len(entries), categories
+    
+    index_data = load_json_mmap(index_file)
+    categories = {metadata["category"] for entry in index_data
+                  if (metadata := entry.get("metadata")) is not None and "category" in metadata}
+    return len(index_data), categories
 
 def test_vector_database(vector_db_dir: Path) -> Dict[str, Any]:
     """Test vector database status and content."""
@@ -32,24 +229,20 @@ def test_vector_database(vector_db_dir: Path) -> Dict[str, Any]:
     
     try:
         # Check vector index
-        index_file = vector_db_dir / "vector_db_index.json"
+        index_file = os.path.join(vector_db_dir, "vector_db_index.json")
         if check_file_exists(index_file):
-            with open(index_file, 'r') as f:
-                index_data = json.load(f)
-                results["total_chunks"] = len(index_data)
-                results["has_index"] = True
-                categories = set()
-                for entry in index_data:
-                    if "metadata" in entry and "category" in entry["metadata"]:
-                        categories.add(entry["metadata"]["category"])
-                results["categories"] = sorted(list(categories))
+            total_chunks, categories = scan_vector_index(index_file)
+            results["total_chunks"] = total_chunks
+            results["has_index"] = True
+            results["categories"] = sorted(list(categories))
         
         # Check observations
-        obs_file = vector_db_dir / "indices" / "agent_observations.json"
-        if check_file_exists(obs_file):
-            with open(obs_file, 'r') as f:
-                obs_data = json.load(f)
-                results["has_observations"] = len(obs_data) > 0
+        # Opening the file answers existence too; an empty file reads as an empty container
+        obs_file = os.path.join(vector_db_dir, "indices", "agent_observations.json")
+        try:
+            results["has_observations"] = not json_container_is_empty(obs_file)
+        except FileNotFoundError:
+            pass
         
         # Determine status
         if results["total_chunks"] > 0:
@@ -65,8 +258,8 @@ def test_vector_database(vector_db_dir: Path) -> Dict[str, Any]:
     
     return results
 
-def test_agent_system(home_dir: Path) -> Dict[str, Any]:
-    """Test agent system installation."""
+def test_agent_system(home_dir: Path, claude_entries: Optional[Dict[str, os.DirEntry]] = None) -> Dict[str, Any]:
+    """Test agent system installation, reusing a ~/.claude listing when one is given."""
     results = {
         "installed": False,
         "global_config": False,
@@ -76,28 +269,28 @@ def test_agent_system(home_dir: Path) -> Dict[str, Any]:
         "errors": []
     }
     
-    claude_dir = home_dir / ".claude"
+    claude_dir = os.path.join(home_dir, ".claude")
     
     try:
+        entries = claude_entries if claude_entries is not None else scan_claude_dir(home_dir)
+        
         # Check global config
-        if check_file_exists(claude_dir / "CLAUDE.md"):
+        if entry_has_content(entries.get("CLAUDE.md")):
             results["global_config"] = True
         
         # Count agents
-        agents_dir = claude_dir / "agents"
-        if agents_dir.exists():
-            agent_files = list(agents_dir.glob("*.md"))
-            results["agents_count"] = len(agent_files)
-            results["installed"] = len(agent_files) > 0
+        if "agents" in entries:
+            agents_count = count_markdown_files(os.path.join(claude_dir, "agents"))
+            results["agents_count"] = agents_count
+            results["installed"] = agents_count > 0
         
         # Check ledgers
-        ledgers_dir = claude_dir / "ledgers"
-        if check_directory_exists(ledgers_dir):
+        if "ledgers" in entries and check_directory_exists(os.path.join(claude_dir, "ledgers")):
             results["ledgers_ready"] = True
         
         # Check observation
-        obs_dir = claude_dir / "global-observation"
-        if check_file_exists(obs_dir / "observation-ledger.json"):
+        if ("global-observation" in entries and
+                check_file_exists(os.path.join(claude_dir, "global-observation", "observation-ledger.json"))):
             results["observation_ready"] = True
     
     except Exception as e:
@@ -105,8 +298,8 @@ def test_agent_system(home_dir: Path) -> Dict[str, Any]:
     
     return results
 
-def test_mcp_integration(home_dir: Path) -> Dict[str, Any]:
-    """Test MCP server integration."""
+def test_mcp_integration(home_dir: Path, claude_entries: Optional[Dict[str, os.DirEntry]] = None) -> Dict[str, Any]:
+    """Test MCP server integration, reusing a ~/.claude listing when one is given."""
     results = {
         "configured": False,
         "vector_search": False,
@@ -115,21 +308,19 @@ def test_mcp_integration(home_dir: Path) -> Dict[str, Any]:
         "errors": []
     }
     
-    config_file = home_dir / ".claude" / "claude_desktop_config.json"
+    config_file = os.path.join(home_dir, ".claude", "claude_desktop_config.json")
     
     try:
-        if check_file_exists(config_file):
+        entries = claude_entries if claude_entries is not None else scan_claude_dir(home_dir)
+        if entry_has_content(entries.get("claude_desktop_config.json")):
             results["configured"] = True
-            results["config_path"] = str(config_file)
+            results["config_path"] = config_file
+            
+            config = read_json_file(config_file)
             
-            with open(config_file, 'r') as f:
-                config = json.load(f)
-                
-            if "mcpServers" in config:
-                if "vector-search" in config["mcpServers"]:
-                    results["vector_search"] = True
-                if "firecrawl" in config["mcpServers"]:
-                    results["firecrawl"] = True
+            servers = config.get("mcpServers") or {}
+            results["vector_search"] = "vector-search" in servers
+            results["firecrawl"] = "firecrawl" in servers
     
     except Exception as e:
         results["errors"].append(str(e))
@@ -148,18 +339,20 @@ def test_doc_tools(doc_tools_dir: Path) -> Dict[str, Any]:
     }
     
     try:
+        entries = scan_directory(doc_tools_dir)
+        
         # Check virtual environment
-        if (doc_tools_dir / "venv").exists():
+        if "venv" in entries:
             results["venv_ready"] = True
         
         # Check scripts
-        if check_file_exists(doc_tools_dir / "SimpleDocScraper.py"):
+        if entry_has_content(entries.get("SimpleDocScraper.py")):
             results["scraper_available"] = True
         
-        if check_file_exists(doc_tools_dir / "DocPostProcessor.py"):
+        if entry_has_content(entries.get("DocPostProcessor.py")):
             results["processor_available"] = True
         
-        if check_file_exists(doc_tools_dir / "DocScraperGUI.py"):
+        if entry_has_content(entries.get("DocScraperGUI.py")):
             results["gui_available"] = True
         
         results["installed"] = (results["venv_ready"] and 
@@ -182,11 +375,12 @@ def test_vector_server(vector_server_dir: Path) -> Dict[str, Any]:
     
     try:
         # Check virtual environment
-        if (vector_server_dir / "venv").exists():
+        if "venv" in scan_directory(vector_server_dir):
             results["venv_ready"] = True
         
         # Check if module exists
-        if check_file_exists(vector_server_dir / "src" / "mcp_vector_server" / "__init__.py"):
+        module_entries = scan_directory(os.path.join(vector_server_dir, "src", "mcp_vector_server"))
+        if entry_has_content(module_entries.get("__init__.py")):
             results["module_importable"] = True
         
         results["installed"] = results["venv_ready"] and results["module_importable"]
@@ -234,8 +428,10 @@ def calculate_success_rate(test_results: Dict[str, Any]) -> float:
     
     return (passed_checks / total_checks * 100) if total_checks > 0 else 0
 
-def generate_markdown_report(test_results: Dict[str, Any], output_file: Path):
+def generate_markdown_report(test_results: Dict[str, Any], output_file: Path, generated_at: Optional[str] = None):
     """Generate markdown installation report."""
+    if generated_at is None:
+        generated_at = time.strftime('%Y-%m-%d %H:%M:%S')
     success_rate = calculate_success_rate(test_results)
     
     # Determine overall status
@@ -249,11 +445,12 @@ def generate_markdown_report(test_results: Dict[str, Any], output_file: Path):
         overall_status = "❌ FAILED - NEEDS ATTENTION"
         status_emoji = "🔧"
     
-    report = f"""# Claude Complete Ecosystem - Installation Report
+    # Collect report fragments and join once at the end
+    parts: List[str] = [f"""# Claude Complete Ecosystem - Installation Report
 
 ## {status_emoji} Installation Status: {overall_status}
 
-**Generated**: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+**Generated**: {generated_at}
 **Success Rate**: {success_rate:.1f}%
 
 ---
@@ -263,51 +460,51 @@ def generate_markdown_report(test_results: Dict[str, Any], output_file: Path):
 ### 1. Vector Database - {test_results['vector_database']['status'].upper()}
 - **Total Chunks**: {test_results['vector_database']['total_chunks']}
 - **Categories**: {', '.join(test_results['vector_database']['categories']) if test_results['vector_database']['categories'] else 'None'}
-- **Has Index**: {'✅ Yes' if test_results['vector_database']['has_index'] else '❌ No'}
-- **Observations Ready**: {'✅ Yes' if test_results['vector_database']['has_observations'] else '❌ No'}
+- **Has Index**: {YES_NO[test_results['vector_database']['has_index']]}
+- **Observations Ready**: {YES_NO[test_results['vector_database']['has_observations']]}
 
-### 2. Agent System - {'INSTALLED' if test_results['agent_system']['installed'] else 'NOT INSTALLED'}
-- **Global Config**: {'✅ Yes' if test_results['agent_system']['global_config'] else '❌ No'}
+### 2. Agent System - {INSTALLED_HEADING[test_results['agent_system']['installed']]}
+- **Global Config**: {YES_NO[test_results['agent_system']['global_config']]}
 - **Agents Count**: {test_results['agent_system']['agents_count']}
-- **Ledgers Ready**: {'✅ Yes' if test_results['agent_system']['ledgers_ready'] else '❌ No'}
-- **Observation System**: {'✅ Ready' if test_results['agent_system']['observation_ready'] else '❌ Not Ready'}
+- **Ledgers Ready**: {YES_NO[test_results['agent_system']['ledgers_ready']]}
+- **Observation System**: {READY[test_results['agent_system']['observation_ready']]}
 
-### 3. MCP Integration - {'CONFIGURED' if test_results['mcp_integration']['configured'] else 'NOT CONFIGURED'}
-- **Config File**: {'✅ Found' if test_results['mcp_integration']['configured'] else '❌ Not Found'}
-- **Vector Search**: {'✅ Configured' if test_results['mcp_integration']['vector_search'] else '❌ Not Configured'}
-- **Firecrawl**: {'✅ Configured' if test_results['mcp_integration']['firecrawl'] else '⚠️ Not Configured (Optional)'}
+### 3. MCP Integration - {CONFIGURED_HEADING[test_results['mcp_integration']['configured']]}
+- **Config File**: {FOUND[test_results['mcp_integration']['configured']]}
+- **Vector Search**: {CONFIGURED[test_results['mcp_integration']['vector_search']]}
+- **Firecrawl**: {OPTIONAL_CONFIGURED[test_results['mcp_integration']['firecrawl']]}
 
-### 4. Documentation Tools - {'INSTALLED' if test_results['doc_tools']['installed'] else 'NOT INSTALLED'}
-- **Virtual Environment**: {'✅ Ready' if test_results['doc_tools']['venv_ready'] else '❌ Not Ready'}
-- **Scraper**: {'✅ Available' if test_results['doc_tools']['scraper_available'] else '❌ Missing'}
-- **Post-Processor**: {'✅ Available' if test_results['doc_tools']['processor_available'] else '❌ Missing'}
-- **GUI Tools**: {'✅ Available' if test_results['doc_tools']['gui_available'] else '❌ Missing'}
+### 4. Documentation Tools - {INSTALLED_HEADING[test_results['doc_tools']['installed']]}
+- **Virtual Environment**: {READY[test_results['doc_tools']['venv_ready']]}
+- **Scraper**: {AVAILABLE[test_results['doc_tools']['scraper_available']]}
+- **Post-Processor**: {AVAILABLE[test_results['doc_tools']['processor_available']]}
+- **GUI Tools**: {AVAILABLE[test_results['doc_tools']['gui_available']]}
 
-### 5. Vector Server - {'INSTALLED' if test_results['vector_server']['installed'] else 'NOT INSTALLED'}
-- **Virtual Environment**: {'✅ Ready' if test_results['vector_server']['venv_ready'] else '❌ Not Ready'}
-- **Module**: {'✅ Importable' if test_results['vector_server']['module_importable'] else '❌ Not Importable'}
+### 5. Vector Server - {INSTALLED_HEADING[test_results['vector_server']['installed']]}
+- **Virtual Environment**: {READY[test_results['vector_server']['venv_ready']]}
+- **Module**: {IMPORTABLE[test_results['vector_server']['module_importable']]}
 
 ---
 
 ## 🔍 Detailed Analysis
 
-"""
+"""]
     
     # Add success features
     if success_rate >= 70:
-        report += """### ✅ Working Features
-"""
+        parts.append("""### ✅ Working Features
+""")
         if test_results['vector_database']['total_chunks'] > 0:
-            report += f"- **Vector Search**: {test_results['vector_database']['total_chunks']} documentation chunks ready for semantic search\n"
+            parts.append(f"- **Vector Search**: {test_results['vector_database']['total_chunks']} documentation chunks ready for semantic search\n")
         if test_results['agent_system']['installed']:
-            report += f"- **Agent Coordination**: {test_results['agent_system']['agents_count']} agents ready for multi-agent workflows\n"
+            parts.append(f"- **Agent Coordination**: {test_results['agent_system']['agents_count']} agents ready for multi-agent workflows\n")
         if test_results['agent_system']['observation_ready']:
-            report += "- **Cross-Project Learning**: Observation system ready to track and improve\n"
+            parts.append("- **Cross-Project Learning**: Observation system ready to track and improve\n")
         if test_results['doc_tools']['installed']:
-            report += "- **Documentation Processing**: Tools ready to scrape and process new documentation\n"
+            parts.append("- **Documentation Processing**: Tools ready to scrape and process new documentation\n")
         if test_results['mcp_integration']['vector_search']:
-            report += "- **MCP Integration**: Vector search integrated with Claude Code\n"
-        report += "\n"
+            parts.append("- **MCP Integration**: Vector search integrated with Claude Code\n")
+        parts.append("\n")
     
     # Add issues if any
     all_errors = []
@@ -316,75 +513,41 @@ def generate_markdown_report(test_results: Dict[str, Any], output_file: Path):
             all_errors.extend(component["errors"])
     
     if all_errors or success_rate < 100:
-        report += """### ⚠️ Issues Found
-"""
+        parts.append("""### ⚠️ Issues Found
+""")
         if not test_results['vector_database']['has_index']:
-            report += "- Vector database needs to be populated with documentation\n"
+            parts.append("- Vector database needs to be populated with documentation\n")
         if not test_results['agent_system']['global_config']:
-            report += "- Agent system global configuration missing\n"
+            parts.append("- Agent system global configuration missing\n")
         if not test_results['mcp_integration']['configured']:
-            report += "- MCP integration not configured in Claude Code\n"
+            parts.append("- MCP integration not configured in Claude Code\n")
         if test_results['vector_database']['total_chunks'] == 0:
-            report += "- No documentation chunks indexed yet\n"
+            parts.append("- No documentation chunks indexed yet\n")
         
         for error in all_errors:
-            report += f"- Error: {error}\n"
-        report += "\n"
+            parts.append(f"- Error: {error}\n")
+        parts.append("\n")
     
     # Add next steps
-    report += """## 🚀 Next Steps
+    parts.append("""## 🚀 Next Steps
 
-"""
+""")
     
     if success_rate >= 90:
-        report += """**Your ecosystem is ready to use!**
-
-1. Restart Claude Code to load the new configuration
-2. Test vector search with queries about Claude Code
-3. Let agents coordinate automatically on your projects
-4. Scrape additional documentation as needed
-
-### Quick Test Commands:
-```bash
-# Test vector search
-cd vector-server && source venv/bin/activate
-VECTOR_DB_PATH="../data/vector_db" python -c "from mcp_vector_server.simple_server import search_documentation; print(search_documentation('memory management'))"
-
-# Scrape new documentation
-cd doc-tools && source venv/bin/activate
-python SimpleDocScraper.py <url>
-```
-"""
+        parts.append(READY_TO_USE_STEPS)
     else:
-        report += """**Some components need attention:**
+        parts.append("""**Some components need attention:**
 
-"""
+""")
         if test_results['vector_database']['total_chunks'] == 0:
-            report += """1. **Populate Vector Database**:
-   ```bash
-   cd data
-   python process_test_data.py
-   python build_vector_index.py
-   ```
-
-"""
+            parts.append(POPULATE_DATABASE_STEP)
         if not test_results['agent_system']['installed']:
-            report += """2. **Install Agent System**:
-   ```bash
-   cd agents
-   ./install.sh
-   ```
-
-"""
+            parts.append(INSTALL_AGENTS_STEP)
         if not test_results['mcp_integration']['configured']:
-            report += """3. **Configure MCP Integration**:
-   - The installer should have created ~/.claude/claude_desktop_config.json
-   - Restart Claude Code after configuration
-
-"""
+            parts.append(CONFIGURE_MCP_STEP)
     
     # Add summary
-    report += f"""---
+    parts.append(f"""---
 
 ## 📈 Installation Summary
 
@@ -396,55 +559,62 @@ python SimpleDocScraper.py <url>
 ---
 
 *Report generated by Claude Complete Ecosystem Installation Validator*
-"""
+""")
     
     # Write report
-    with open(output_file, 'w') as f:
-        f.write(report)
+    output_file.write_text("".join(parts))
     
     return success_rate
 
 def main():
     """Main function to generate installation report."""
-    # Paths
-    script_dir = Path(__file__).parent
-    project_root = script_dir.parent
-    home_dir = Path.home()
-    
     print("📋 Generating Installation Report")
     print("=" * 50)
     
     # Run all tests
     print("🔍 Testing components...")
     
-    test_results = {
-        "vector_database": test_vector_database(script_dir / "vector_db"),
-        "agent_system": test_agent_system(home_dir),
-        "mcp_integration": test_mcp_integration(home_dir),
-        "doc_tools": test_doc_tools(project_root / "doc-tools"),
-        "vector_server": test_vector_server(project_root / "vector-server")
+    # The agent and MCP probes share one listing of ~/.claude
+    claude_entries = scan_claude_dir(HOME_DIR)
+    
+    probes = {
+        "vector_database": (test_vector_database, SCRIPT_DIR / "vector_db"),
+        "agent_system": (test_agent_system, HOME_DIR, claude_entries),
+        "mcp_integration": (test_mcp_integration, HOME_DIR, claude_entries),
+        "doc_tools": (test_doc_tools, PROJECT_ROOT / "doc-tools"),
+        "vector_server": (test_vector_server, PROJECT_ROOT / "vector-server")
     }
     
-    # Generate report
-    report_file = project_root / "INSTALLATION_REPORT.md"
-    success_rate = generate_markdown_report(test_results, report_file)
+    # The probes are independent filesystem checks, so run them side by side
+    with ThreadPoolExecutor(max_workers=len(probes)) as executor:
+        futures = {name: executor.submit(probe, *args) for name, (probe, *args) in probes.items()}
+        test_results = {name: future.result() for name, future in futures.items()}
     
-    # Console output
-    print("\n" + "=" * 50)
+    # Generate report
+    report_file = PROJECT_ROOT / "INSTALLATION_REPORT.md"
+    generated_at = time.strftime('%Y-%m-%d %H:%M:%S')
+    success_rate = generate_markdown_report(test_results, report_file, generated_at)
     
+    # Console output, assembled and written in one go
     if success_rate >= 90:
-        print("✅ Installation Successful!")
+        verdict = "✅ Installation Successful!"
     elif success_rate >= 70:
-        print("⚠️ Installation Partially Successful")
+        verdict = "⚠️ Installation Partially Successful"
     else:
-        print("❌ Installation Failed")
-    
-    print(f"\n📊 Results:")
-    print(f"   • Success Rate: {success_rate:.1f}%")
-    print(f"   • Vector DB: {test_results['vector_database']['total_chunks']} chunks")
-    print(f"   • Agents: {test_results['agent_system']['agents_count']} installed")
-    print(f"   • MCP: {'✅ Configured' if test_results['mcp_integration']['configured'] else '❌ Not configured'}")
-    print(f"\n📄 Full report saved to: {report_file}")
+        verdict = "❌ Installation Failed"
+    
+    lines = [
+        "\n" + "=" * 50,
+        verdict,
+        f"\n📊 Results:",
+        f"   • Success Rate: {success_rate:.1f}%",
+        f"   • Vector DB: {test_results['vector_database']['total_chunks']} chunks",
+        f"   • Agents: {test_results['agent_system']['agents_count']} installed",
+        f"   • MCP: {'✅ Configured' if test_results['mcp_integration']['configured'] else '❌ Not configured'}",
+        f"\n📄 Full report saved to: {report_file}",
+    ]
+    sys.stdout.write("\n".join(lines) + "\n")
+    sys.stdout.flush()
     
     return success_rate >= 70
 
@@ -6,15 +6,59 @@ This enables AI agents to record observations and improve over time.
 
 import json
 import os
+import sys
 from pathlib import Path
 from datetime import datetime
 import uuid
+from typing import Optional
 
-def create_observation_structure():
+from _json_io import encode_json
+
+# Locations resolved once at import time
+SCRIPT_DIR = Path(__file__).parent
+HOME_DIR = Path.home()
+
+def write_if_new(file_path: Path, payload: bytes) -> bool:
+    """Create a file with the given contents unless it already exists."""
+    try:
+        fd = os.open(file_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+    except FileExistsError:
+        return False
+    try:
+        try:
+            view = memoryview(payload)
+            while view:
+                written = os.write(fd, view)
+                view = view[written:]
+        finally:
+            os.close(fd)
+    except BaseException:
+        # A partial file would pass for an initialized one on every later run
+        os.unlink(file_path)
+        raise
+    return True
+
+# Placeholder swapped for the creation timestamp when a ledger is written
+CREATED_AT_PLACEHOLDER = "__CREATED_AT__"
+
+# Empty agent ledger, encoded once at import time
+LEDGER_TEMPLATE = encode_json({
+    "version": "1.0.0",
+    "created_at": CREATED_AT_PLACEHOLDER,
+    "tasks": [],
+    "completed_count": 0,
+    "in_progress_count": 0,
+    "pending_count": 0
+}, indent=True)
+
+def create_observation_structure(now_iso: Optional[str] = None):
     """Create the initial observation system structure."""
+    if now_iso is None:
+        now_iso = datetime.now().isoformat()
+    
     return {
         "version": "1.0.0",
-        "created_at": datetime.now().isoformat(),
+        "created_at": now_iso,
         "observations": [],
         "patterns": {},
         "improvements": [],
@@ -26,11 +70,14 @@ def create_observation_structure():
         }
     }
 
-def create_sample_observation():
+def create_sample_observation(now_iso: Optional[str] = None):
     """Create a sample observation to demonstrate the system."""
+    if now_iso is None:
+        now_iso = datetime.now().isoformat()
+    
     return {
         "id": f"obs_{uuid.uuid4().hex[:8]}",
-        "timestamp": datetime.now().isoformat(),
+        "timestamp": now_iso,
         "agent": "control-agent",
         "project": "claude-complete-ecosystem",
         "type": "system_initialization",
@@ -51,8 +98,11 @@ def create_sample_observation():
         "recommendations": []
     }
 
-def initialize_ledgers(ledger_dir: Path):
+def initialize_ledgers(ledger_dir: Path, now_iso: Optional[str] = None):
     """Initialize agent ledger files."""
+    if now_iso is None:
+        now_iso = datetime.now().isoformat()
+    
     ledgers = [
         "control-tasks.json",
         "backend-tasks.json",
@@ -67,27 +117,21 @@ def initialize_ledgers(ledger_dir: Path):
         "improvement-tasks.json"
     ]
     
-    ledger_template = {
-        "version": "1.0.0",
-        "created_at": datetime.now().isoformat(),
-        "tasks": [],
-        "completed_count": 0,
-        "in_progress_count": 0,
-        "pending_count": 0
-    }
+    # Every ledger starts from the same pre-encoded template
+    payload = LEDGER_TEMPLATE.replace(CREATED_AT_PLACEHOLDER.encode(), now_iso.encode())
     
     for ledger_name in ledgers:
-        ledger_file = ledger_dir / ledger_name
-        if not ledger_file.exists():
-            with open(ledger_file, 'w') as f:
-                json.dump(ledger_template, f, indent=2)
+        if write_if_new(ledger_dir / ledger_name, payload):
             print(f"   ✅ Initialized {ledger_name}")
 
-def initialize_global_observation(global_obs_dir: Path):
+def initialize_global_observation(global_obs_dir: Path, now_iso: Optional[str] = None):
     """Initialize global observation ledger."""
+    if now_iso is None:
+        now_iso = datetime.now().isoformat()
+    
     observation_ledger = {
         "version": "1.0.0",
-        "created_at": datetime.now().isoformat(),
+        "created_at": now_iso,
         "global_observations": [],
         "cross_project_patterns": {},
         "improvement_suggestions": [],
@@ -103,23 +147,23 @@ def initialize_global_observation(global_obs_dir: Path):
     }
     
     ledger_file = global_obs_dir / "observation-ledger.json"
-    if not ledger_file.exists():
-        with open(ledger_file, 'w') as f:
-            json.dump(observation_ledger, f, indent=2)
+    if write_if_new(ledger_file, encode_json(observation_ledger, indent=True)):
         print("   ✅ Initialized global observation ledger")
 
 def main():
     """Main initialization function."""
     # Paths
-    script_dir = Path(__file__).parent
-    vector_db_dir = script_dir / "vector_db"
+    vector_db_dir = SCRIPT_DIR / "vector_db"
     indices_dir = vector_db_dir / "indices"
     
     # Also prepare paths for agent system (in user home)
-    home_claude_dir = Path.home() / ".claude"
+    home_claude_dir = HOME_DIR / ".claude"
     ledgers_dir = home_claude_dir / "ledgers"
     global_obs_dir = home_claude_dir / "global-observation"
     
+    # One timestamp for everything created in this run
+    now_iso = datetime.now().isoformat()
+    
     print("🔍 Initializing Agent Observation System")
     print("=" * 50)
     
@@ -139,7 +183,7 @@ def main():
     
     # Add sample observation if empty
     if not observations:
-        sample_obs = create_sample_observation()
+        sample_obs = create_sample_observation(now_iso)
         observations.append(sample_obs)
         print("   ✅ Added sample observation")
     
@@ -152,8 +196,8 @@ def main():
     obs_metadata_file = indices_dir / "observation_metadata.json"
     obs_metadata = {
         "version": "1.0.0",
-        "initialized_at": datetime.now().isoformat(),
-        "last_updated": datetime.now().isoformat(),
+        "initialized_at": now_iso,
+        "last_updated": now_iso,
         "total_observations": len(observations),
         "observation_types": ["system_initialization", "task_completion", "error_recovery", "performance_optimization"],
         "tracked_agents": [
@@ -175,14 +219,14 @@ def main():
     # Initialize ledgers if they don't exist
     if ledgers_dir.exists():
         print("\n📝 Checking agent ledgers...")
-        initialize_ledgers(ledgers_dir)
+        initialize_ledgers(ledgers_dir, now_iso)
     else:
         print("   ℹ️ Agent ledgers will be created during agent system installation")
     
     # Initialize global observation if directory exists
     if global_obs_dir.exists():
         print("\n🌍 Checking global observation system...")
-        initialize_global_observation(global_obs_dir)
+        initialize_global_observation(global_obs_dir, now_iso)
     else:
         print("   ℹ️ Global observation will be created during agent system installation")
     
@@ -217,24 +261,27 @@ def main():
         json.dump(obs_config, f, indent=2)
     print("\n⚙️ Observation system configuration created")
     
-    # Summary
-    print("\n" + "=" * 50)
-    print("✅ Agent Observation System Initialized!")
-    print(f"📊 Summary:")
-    print(f"   • Observation storage: Ready")
-    print(f"   • Cross-project tracking: Enabled")
-    print(f"   • Pattern recognition: Enabled")
-    print(f"   • Improvement suggestions: Enabled")
-    print(f"   • Location: {obs_file}")
-    print(f"\n💡 The system will now:")
-    print(f"   • Record agent activities across projects")
-    print(f"   • Identify successful patterns")
-    print(f"   • Generate improvement suggestions")
-    print(f"   • Track performance metrics")
+    # Summary, assembled and written in one go
+    summary = [
+        "\n" + "=" * 50,
+        "✅ Agent Observation System Initialized!",
+        "📊 Summary:",
+        "   • Observation storage: Ready",
+        "   • Cross-project tracking: Enabled",
+        "   • Pattern recognition: Enabled",
+        "   • Improvement suggestions: Enabled",
+        f"   • Location: {obs_file}",
+        "\n💡 The system will now:",
+        "   • Record agent activities across projects",
+        "   • Identify successful patterns",
+        "   • Generate improvement suggestions",
+        "   • Track performance metrics",
+    ]
+    sys.stdout.write("\n".join(summary) + "\n")
+    sys.stdout.flush()
     
     return True
 
 if __name__ == "__main__":
-    import sys
     success = main()
     sys.exit(0 if success else 1)
\ No newline at end of file
@@ -5,94 +5,150 @@ This script converts raw markdown files into structured chunks with metadata.
 """
 
 import os
-import json
+import sys
 import hashlib
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from itertools import repeat
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 import re
 
+from _json_io import encode_json, parse_json
+
+# Runs of two or more capitals (API, CLI, MCP, ...) count as technical terms
+TECHNICAL_TERM_PATTERN = re.compile(r'\b[A-Z]{2,}\b')
+
+# First line whose non-blank text starts with '#'
+HEADER_LINE_PATTERN = re.compile(r'^[^\S\n]*#.*$', re.MULTILINE)
+
+# File name substrings mapped to categories; the first match wins
+CATEGORY_RULES = (
+    ('quickstart', 'getting_started'),
+    ('troubleshoot', 'troubleshooting'),
+    ('security', 'security'),
+    ('memory', 'memory'),
+    ('mcp', 'mcp'),
+    ('workflow', 'workflows'),
+    ('reference', 'reference'),
+    ('cli', 'reference'),
+    ('config', 'configuration'),
+    ('terminal', 'configuration'),
+    ('costs', 'usage'),
+    ('analytics', 'usage'),
+)
+
+# Bump when the chunk output format changes so cached shards are rebuilt.
+# Version 3: chunk IDs changed from MD5 to BLAKE2b, so older manifests trigger a rebuild
+MANIFEST_VERSION = 3
+
+def write_json(file_path: Path, data: Any):
+    """Write data to a file as indented UTF-8 JSON."""
+    file_path.write_bytes(encode_json(data, indent=True))
+
+def write_json_lines(file_path: Path, items: List[Any]):
+    """Write items as a JSON Lines file (one object per line) in a single write."""
+    file_path.write_bytes(b"".join(encode_json(item) + b"\n" for item in items))
+
+def load_manifest(manifest_file: Path) -> Dict[str, Any]:
+    """Load the per-source entries of the last run's manifest (empty if missing or outdated)."""
+    try:
+        with open(manifest_file, 'rb') as f:
+            manifest = parse_json(f.read())
+    except (FileNotFoundError, ValueError):
+        return {}
+    # A truncated or hand-edited manifest just means a full rebuild
+    if not isinstance(manifest, dict) or manifest.get("version") != MANIFEST_VERSION:
+        return {}
+    files = manifest.get("files", {})
+    return files if isinstance(files, dict) else {}
+
 def generate_chunk_id(content: str) -> str:
     """Generate a unique ID for a chunk based on its content."""
-    return hashlib.md5(content.encode()).hexdigest()[:8]
+    # Same 8-hex-character length as the old truncated MD5, but the IDs differ from the
+    # MD5-based ones, so rebuild the index after upgrading from MD5-era output
+    return hashlib.blake2b(content.encode(), digest_size=4).hexdigest()
 
 def extract_title(content: str) -> str:
     """Extract title from markdown content."""
-    lines = content.split('\n')
-    for line in lines:
-        if line.strip().startswith('#'):
-            return line.strip('#').strip()
+    # Stop at the first header instead of splitting the whole document into lines
+    header_match = HEADER_LINE_PATTERN.search(content)
+    if header_match:
+        return header_match.group(0).strip('#').strip()
     return "Untitled"
 
+def extract_section_title(chunk_content: str) -> Optional[str]:
+    """Extract the heading text when a chunk starts with a markdown header."""
+    if not chunk_content.startswith('#'):
+        return None
+    
+    # Hashes must be followed by whitespace, then the title runs to the end of the line
+    after_hashes = chunk_content.lstrip('#')
+    title = after_hashes.lstrip()
+    if len(title) == len(after_hashes) or not title:
+        return None
+    return title.split('\n', 1)[0]
+
+@lru_cache(maxsize=4096)
+def category_for_name(file_name: str) -> Optional[str]:
+    """Return the category of the first rule matching a lowercase file name."""
+    for pattern, category in CATEGORY_RULES:
+        if pattern in file_name:
+            return category
+    return None
+
 def categorize_content(file_path: str, content: str) -> str:
     """Categorize content based on file name and content."""
     file_name = os.path.basename(file_path).lower()
+    name_category = category_for_name(file_name)
     
-    if 'quickstart' in file_name or 'getting' in content.lower()[:500]:
+    if name_category == 'getting_started' or 'getting' in content[:500].lower():
         return 'getting_started'
-    elif 'troubleshoot' in file_name:
-        return 'troubleshooting'
-    elif 'security' in file_name:
-        return 'security'
-    elif 'memory' in file_name:
-        return 'memory'
-    elif 'mcp' in file_name:
-        return 'mcp'
-    elif 'workflow' in file_name:
-        return 'workflows'
-    elif 'reference' in file_name or 'cli' in file_name:
-        return 'reference'
-    elif 'config' in file_name or 'terminal' in file_name:
-        return 'configuration'
-    elif 'costs' in file_name or 'analytics' in file_name:
-        return 'usage'
-    else:
-        return 'general'
+    return name_category or 'general'
 
 def calculate_complexity(content: str) -> float:
     """Calculate content complexity score (0-1)."""
     # Simple heuristic based on code blocks, technical terms, and length
     code_blocks = content.count('```')
-    technical_terms = len(re.findall(r'\b[A-Z]{2,}\b', content))
+    technical_terms = len(TECHNICAL_TERM_PATTERN.findall(content))
     length_factor = min(len(content) / 5000, 1.0)
     
     complexity = (code_blocks * 0.1 + technical_terms * 0.02 + length_factor * 0.3)
     return min(complexity, 1.0)
 
-def split_into_chunks(content: str, max_chunk_size: int = 1000) -> List[str]:
-    """Split content into semantic chunks."""
+def pack_pieces(pieces: List[str], separator: str, max_chunk_size: int) -> List[str]:
+    """Greedily pack consecutive pieces into chunks smaller than max_chunk_size."""
     chunks = []
+    buffer = []
+    size = 0
     
-    # Split by sections (headers)
-    sections = re.split(r'\n(?=#)', content)
-    
-    current_chunk = ""
-    for section in sections:
-        if len(current_chunk) + len(section) < max_chunk_size:
-            current_chunk += section + "\n"
+    # Collect pieces in a list and join once per chunk instead of growing a string
+    for piece in pieces:
+        if size + len(piece) < max_chunk_size:
+            buffer.append(piece)
+            buffer.append(separator)
+            size += len(piece) + len(separator)
         else:
-            if current_chunk:
-                chunks.append(current_chunk.strip())
-            current_chunk = section
+            if size:
+                chunks.append("".join(buffer).strip())
+            buffer = [piece]
+            size = len(piece)
     
-    if current_chunk:
-        chunks.append(current_chunk.strip())
+    if size:
+        chunks.append("".join(buffer).strip())
+    
+    return chunks
+
+def split_into_chunks(content: str, max_chunk_size: int = 1000) -> List[str]:
+    """Split content into semantic chunks."""
+    # Split by sections (headers): break before every line that starts with '#'
+    parts = content.split('\n#')
+    sections = [parts[0]] + ['#' + part for part in parts[1:]]
+    chunks = pack_pieces(sections, "\n", max_chunk_size)
     
     # If no sections or very few chunks, split by paragraphs
     if len(chunks) <= 1:
-        paragraphs = content.split('\n\n')
-        chunks = []
-        current_chunk = ""
-        
-        for para in paragraphs:
-            if len(current_chunk) + len(para) < max_chunk_size:
-                current_chunk += para + "\n\n"
-            else:
-                if current_chunk:
-                    chunks.append(current_chunk.strip())
-                current_chunk = para
-        
-        if current_chunk:
-            chunks.append(current_chunk.strip())
+        chunks = pack_pieces(content.split('\n\n'), "\n\n", max_chunk_size)
     
     return chunks
 
@@ -109,7 +165,7 @@ def process_markdown_file(file_path: str, base_dir: str) -> List[Dict[str, Any]]
         
         doc_title = extract_title(content)
         category = categorize_content(file_path, content)
-        complexity = calculate_complexity(content)
+        complexity = round(calculate_complexity(content), 5)
         
         # Get relative path for source tracking
         rel_path = os.path.relpath(file_path, base_dir)
@@ -125,7 +181,7 @@ def process_markdown_file(file_path: str, base_dir: str) -> List[Dict[str, Any]]
                     "source_file": rel_path,
                     "doc_title": doc_title,
                     "category": category,
-                    "complexity": round(complexity, 5),
+                    "complexity": complexity,
                     "chunk_index": i,
                     "total_chunks": len(content_chunks),
                     "type": "text"
@@ -133,9 +189,9 @@ def process_markdown_file(file_path: str, base_dir: str) -> List[Dict[str, Any]]
             }
             
             # Extract section title if present
-            section_match = re.match(r'^#+\s+(.+)', chunk_content)
-            if section_match:
-                chunk["metadata"]["section_title"] = section_match.group(1)
+            section_title = extract_section_title(chunk_content)
+            if section_title:
+                chunk["metadata"]["section_title"] = section_title
             
             chunks.append(chunk)
     
@@ -158,62 +214,124 @@ def main():
     print("📋 Processing Test Data for Vector Database")
     print("=" * 50)
     
-    # Find all markdown files
-    md_files = list(test_data_dir.glob("*.md"))
+    # Find all markdown files; scandir entries know their type and cache stat()
+    with os.scandir(test_data_dir) as entries:
+        md_files = [entry for entry in entries if entry.name.endswith('.md') and entry.is_file()]
     print(f"📁 Found {len(md_files)} markdown files to process")
     
-    all_chunks = []
+    # Skip summary files
+    source_files = [md_file for md_file in md_files
+                    if not (md_file.name.startswith('_') or 'summary' in md_file.name.lower())]
+    
+    # Sources whose size and mtime match the last run keep their existing shard
+    manifest_file = output_dir / ".manifest.json"
+    previous_manifest = load_manifest(manifest_file)
+    unchanged = set()
+    for md_file in source_files:
+        entry = previous_manifest.get(md_file.name)
+        file_stat = md_file.stat()
+        if (entry and entry["mtime_ns"] == file_stat.st_mtime_ns and entry["size"] == file_stat.st_size
+                and (chunks_dir / entry["shard"]).exists()):
+            unchanged.add(md_file.name)
+    changed_files = [md_file for md_file in source_files if md_file.name not in unchanged]
+    
+    # Running totals for the summary, so chunks are not kept around once written
     file_count = 0
+    total_chunks = 0
+    complexity_sum = 0.0
+    categories = set()
+    manifest = {}
+    progress = []
     
-    # Process each file
-    for md_file in md_files:
-        # Skip summary files
-        if md_file.name.startswith('_') or 'summary' in md_file.name.lower():
-            continue
+    # Chunking is CPU bound and independent per file, so spread it over worker
+    # processes; map() yields results in file order, keeping the numbering stable
+    with ProcessPoolExecutor() as executor:
+        results = executor.map(process_markdown_file,
+                               [md_file.path for md_file in changed_files],
+                               repeat(str(script_dir)),
+                               chunksize=4)
         
-        print(f"📄 Processing: {md_file.name}")
-        chunks = process_markdown_file(str(md_file), str(script_dir))
-        
-        if chunks:
-            # Save chunks for this file
-            file_id = f"{file_count:04d}_{md_file.stem}"
-            file_chunks_dir = chunks_dir / file_id
-            file_chunks_dir.mkdir(exist_ok=True)
+        for md_file in source_files:
+            progress.append(f"📄 Processing: {md_file.name}")
+            shard_name = f"shard_{file_count:04d}_{os.path.splitext(md_file.name)[0]}.jsonl"
             
-            for i, chunk in enumerate(chunks):
-                chunk_file = file_chunks_dir / f"chunk_{i:03d}.json"
-                with open(chunk_file, 'w', encoding='utf-8') as f:
-                    json.dump(chunk, f, indent=2, ensure_ascii=False)
+            if md_file.name in unchanged:
+                # Earlier sources may have been added or removed, so renumber the shard if needed
+                previous_shard = chunks_dir / previous_manifest[md_file.name]["shard"]
+                if previous_shard.name != shard_name:
+                    os.replace(previous_shard, chunks_dir / shard_name)
+                source_summary = previous_manifest[md_file.name]
+                status = f"   ♻️ Unchanged, reused {source_summary['chunks']} chunks"
+            else:
+                chunks = next(results)
+                if not chunks:
+                    continue
+                
+                # Save this file's chunks as one JSON Lines shard instead of a file per chunk;
+                # category and complexity are per file, so the first chunk speaks for all
+                write_json_lines(chunks_dir / shard_name, chunks)
+                source_summary = {
+                    "chunks": len(chunks),
+                    "category": chunks[0]["metadata"]["category"],
+                    "complexity": chunks[0]["metadata"]["complexity"]
+                }
+                status = f"   ✅ Created {len(chunks)} chunks"
             
-            all_chunks.extend(chunks)
+            file_stat = md_file.stat()
+            manifest[md_file.name] = {
+                "mtime_ns": file_stat.st_mtime_ns,
+                "size": file_stat.st_size,
+                "shard": shard_name,
+                "chunks": source_summary["chunks"],
+                "category": source_summary["category"],
+                "complexity": source_summary["complexity"]
+            }
             file_count += 1
-            print(f"   ✅ Created {len(chunks)} chunks")
+            total_chunks += source_summary["chunks"]
+            complexity_sum += source_summary["complexity"] * source_summary["chunks"]
+            categories.add(source_summary["category"])
+            progress.append(status)
+    
+    # Per-file progress is collected and written in one go rather than line by line
+    if progress:
+        sys.stdout.write("\n".join(progress) + "\n")
+        sys.stdout.flush()
+    
+    # Drop shards of sources that were removed or no longer produce chunks
+    kept_shards = {entry["shard"] for entry in manifest.values()}
+    for stale_shard in chunks_dir.glob("shard_*.jsonl"):
+        if stale_shard.name not in kept_shards:
+            stale_shard.unlink()
+    
+    write_json(manifest_file, {"version": MANIFEST_VERSION, "files": manifest})
     
     # Create summary
     summary = {
         "total_files": file_count,
-        "total_chunks": len(all_chunks),
-        "categories": list(set(c["metadata"]["category"] for c in all_chunks)),
-        "avg_complexity": sum(c["metadata"]["complexity"] for c in all_chunks) / len(all_chunks) if all_chunks else 0,
+        "total_chunks": total_chunks,
+        "categories": list(categories),
+        "avg_complexity": complexity_sum / total_chunks if total_chunks else 0,
         "status": "completed"
     }
     
     # Save summary
-    with open(output_dir / "processing_summary.json", 'w') as f:
-        json.dump(summary, f, indent=2)
-    
-    print("\n" + "=" * 50)
-    print("✅ Processing Complete!")
-    print(f"📊 Summary:")
-    print(f"   • Files processed: {summary['total_files']}")
-    print(f"   • Total chunks created: {summary['total_chunks']}")
-    print(f"   • Categories: {', '.join(summary['categories'])}")
-    print(f"   • Average complexity: {summary['avg_complexity']:.2f}")
-    print(f"   • Output directory: {output_dir}")
+    write_json(output_dir / "processing_summary.json", summary)
+    
+    lines = [
+        "\n" + "=" * 50,
+        "✅ Processing Complete!",
+        "📊 Summary:",
+        f"   • Files processed: {summary['total_files']}",
+        f"   • Total chunks created: {summary['total_chunks']}",
+        f"   • Categories: {', '.join(summary['categories'])}",
+        f"   • Average complexity: {summary['avg_complexity']:.2f}",
+        f"   • Output directory: {output_dir}",
+    ]
+    sys.stdout.write("\n".join(lines) + "\n")
+    sys.stdout.flush()
     
     return summary['total_chunks'] > 0
 
 if __name__ == "__main__":
-    import sys
     success = main()
     sys.exit(0 if success else 1)
\ No newline at end of file
@@ -4,26 +4,44 @@ Documentation Post-Processor
 Cleans, structures, and sorts scraped markdown files for optimal vector database ingestion.
 """
 
+import os
 import re
 import json
 import asyncio
 from pathlib import Path
-from typing import List, Dict, Tuple, Optional, Any
+from typing import List, Dict, Tuple, Optional, Any, Callable, Iterator, AsyncIterator
 from datetime import datetime
 import logging
 from dataclasses import dataclass, field
 from collections import defaultdict
 import yaml
 import hashlib
+import functools
+import shelve
+from concurrent.futures import ProcessPoolExecutor
 
 from bs4 import BeautifulSoup
 from openai import AsyncOpenAI
-from tenacity import retry, stop_after_attempt, wait_exponential
 import numpy as np
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.cluster import KMeans
 import networkx as nx
 
+from batch_client import submit_batch, await_batch
+from classification_cache import ClassificationCache
+
+try:
+    import ahocorasick
+except ImportError:
+    # Optional: dependency scanning falls back to per-document substring checks
+    ahocorasick = None
+
+try:
+    import orjson
+except ImportError:
+    # Optional: output files are written with the stdlib json module without it
+    orjson = None
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -31,6 +49,86 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Processed documents are cached here between runs; bump the version
+# whenever cleaning or chunking changes so stale entries are ignored
+PROCESS_CACHE_NAME = '.proc_cache'
+PROCESS_CACHE_VERSION = 1
+
+# Prefer the libyaml-backed loader when PyYAML was built with it
+YAML_LOADER = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+
+def encode_json(data: Any, indent: bool = False) -> bytes:
+    """Serialize data as JSON bytes, optionally indented by two spaces."""
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+        return orjson.dumps(data, option=option)
+    return json.dumps(data, indent=2 if indent else None).encode()
+
+
+def dump_json(data: Any, path: Path) -> None:
+    """Write data to path as indented JSON."""
+    with open(path, 'wb') as f:
+        f.write(encode_json(data, indent=True))
+
+
+def iter_markdown_files(root: Path, recursive: bool = True) -> Iterator[Path]:
+    """Yield markdown files under root, skipping '_' summary files."""
+    subdirs = []
+    with os.scandir(root) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                subdirs.append(entry.path)
+            elif entry.name.endswith('.md') and not entry.name.startswith('_') and entry.is_file():
+                yield Path(entry.path)
+    
+    # Descend after the directory's own files, the same order rglob uses
+    if recursive:
+        for subdir in subdirs:
+            yield from iter_markdown_files(Path(subdir))
+
+
+async def aiter_markdown_files(root: Path, recursive: bool = True) -> AsyncIterator[Path]:
+    """Walk for markdown files in a worker thread, yielding each one as soon as it is found."""
+    loop = asyncio.get_running_loop()
+    found: asyncio.Queue = asyncio.Queue()
+    done = object()
+    
+    def walk() -> None:
+        try:
+            for path in iter_markdown_files(root, recursive=recursive):
+                loop.call_soon_threadsafe(found.put_nowait, path)
+        finally:
+            loop.call_soon_threadsafe(found.put_nowait, done)
+    
+    walker = loop.run_in_executor(None, walk)
+    while (path := await found.get()) is not done:
+        yield path
+    
+    # Surface any error raised while walking
+    await walker
+
+
+def generate_chunk_id(content: str) -> str:
+    """Generate a short content-derived ID for a chunk."""
+    # Same 8-hex-character length as the old truncated MD5, but the IDs differ from the
+    # MD5-based ones: re-processing older output directories assigns new chunk IDs
+    return hashlib.blake2b(content.encode(), digest_size=4).hexdigest()
+
+
+@functools.lru_cache(maxsize=512)
+def _parse_frontmatter(frontmatter: str) -> Any:
+    """Parse YAML frontmatter, converting datetime values to ISO strings."""
+    metadata = yaml.load(frontmatter, Loader=YAML_LOADER)
+    
+    # Convert any datetime objects to strings
+    if metadata:
+        for key, value in metadata.items():
+            if hasattr(value, 'isoformat'):  # Check if it's a datetime object
+                metadata[key] = value.isoformat()
+    
+    return metadata
+
 
 @dataclass
 class DocumentChunk:
@@ -53,6 +151,18 @@ class DocumentChunk:
             'position': self.position,
             'tokens': self.tokens
         }
+    
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'DocumentChunk':
+        """Rebuild a chunk from its stored dictionary."""
+        return cls(
+            content=data['content'],
+            metadata=data['metadata'],
+            chunk_id=data['chunk_id'],
+            parent_doc=data['parent_doc'],
+            position=data['position'],
+            tokens=data['tokens']
+        )
 
 
 @dataclass
@@ -79,69 +189,111 @@ class ProcessedDocument:
             'dependencies': self.dependencies,
             'complexity_score': self.complexity_score
         }
+    
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'ProcessedDocument':
+        """Rebuild a document from its stored dictionary."""
+        return cls(
+            file_path=data['file_path'],
+            original_url=data['original_url'],
+            title=data['title'],
+            chunks=[DocumentChunk.from_dict(chunk) for chunk in data['chunks']],
+            category=data['category'],
+            topics=data['topics'],
+            dependencies=data['dependencies'],
+            complexity_score=data['complexity_score']
+        )
 
 
 class DocumentCleaner:
     """Cleans markdown documents by removing headers, footers, and navigation elements."""
     
+    # Common patterns to remove
+    HEADER_PATTERNS = (
+        r'\[.*?home page.*?\]\(.*?\)',  # Home page links
+        r'Search\.\.\.',  # Search placeholders
+        r'⌘K',  # Keyboard shortcuts
+        r'Navigation',  # Navigation text
+        r'\* \[Research\].*?\n',  # Navigation links
+        r'\* \[News\].*?\n',
+        r'\* \[Go to.*?\].*?\n',
+        r'English\n',  # Language selector
+        r'!\[.*?logo\]\(.*?\)',  # Logo images
+    )
+    
+    FOOTER_PATTERNS = (
+        r'Was this page helpful\?.*?YesNo',
+        r'\[x\]\(https://x\.com/.*?\)',  # Social media links
+        r'\[linkedin\]\(.*?\)',
+        r'On this page\n.*?(?=\n\n|\Z)',  # Table of contents
+    )
+    
+    NAVIGATION_PATTERNS = (
+        r'\[Welcome\]\(.*?\)',
+        r'\[Developer Guide\]\(.*?\)',
+        r'\[API Guide\]\(.*?\)',
+        r'\[Resources\]\(.*?\)',
+        r'\[Release Notes\]\(.*?\)',
+        r'\* \[Documentation\]\(.*?\)',
+        r'\* \[Developer Console\]\(.*?\)',
+        r'\* \[Support\]\(.*?\)',
+    )
+    
+    # Fixed cleanup patterns, compiled once for every instance
+    MULTI_BLANK_RE = re.compile(r'\n{3,}')
+    MULTI_SPACE_RE = re.compile(r' {2,}')
+    EMPTY_BULLET_RE = re.compile(r'^\* *$', re.MULTILINE)
+    NAV_SECTION_RE = re.compile(
+        r'^#{1,5} *(First steps|Models & pricing|Learn about Claude|Explore features|Agent components|Test & evaluate|Legal center)\n.*?(?=^#|\Z)',
+        re.MULTILINE | re.DOTALL
+    )
+    CODE_BLOCK_RE = re.compile(r'```[\s\S]*?```')
+    BLANK_LINE_RE = re.compile(r'^\s*\n', re.MULTILINE)
+    STASHED_BLOCK_RE = re.compile(r'\x00(\d+)\x00')
+    
     def __init__(self):
-        # Common patterns to remove
-        self.header_patterns = [
-            r'\[.*?home page.*?\]\(.*?\)',  # Home page links
-            r'Search\.\.\.',  # Search placeholders
-            r'⌘K',  # Keyboard shortcuts
-            r'Navigation',  # Navigation text
-            r'\* \[Research\].*?\n',  # Navigation links
-            r'\* \[News\].*?\n',
-            r'\* \[Go to.*?\].*?\n',
-            r'English\n',  # Language selector
-            r'!\[.*?logo\]\(.*?\)',  # Logo images
-        ]
-        
-        self.footer_patterns = [
-            r'Was this page helpful\?.*?YesNo',
-            r'\[x\]\(https://x\.com/.*?\)',  # Social media links
-            r'\[linkedin\]\(.*?\)',
-            r'On this page\n.*?(?=\n\n|\Z)',  # Table of contents
-        ]
-        
-        self.navigation_patterns = [
-            r'\[Welcome\]\(.*?\)',
-            r'\[Developer Guide\]\(.*?\)',
-            r'\[API Guide\]\(.*?\)',
-            r'\[Resources\]\(.*?\)',
-            r'\[Release Notes\]\(.*?\)',
-            r'\* \[Documentation\]\(.*?\)',
-            r'\* \[Developer Console\]\(.*?\)',
-            r'\* \[Support\]\(.*?\)',
-        ]
+        # Per-instance copies so callers can extend them
+        self.header_patterns = list(self.HEADER_PATTERNS)
+        self.footer_patterns = list(self.FOOTER_PATTERNS)
+        self.navigation_patterns = list(self.NAVIGATION_PATTERNS)
+    
+    @staticmethod
+    @functools.lru_cache(maxsize=64)
+    def _combine(patterns: Tuple[str, ...], flags: int) -> re.Pattern:
+        """Compile patterns into a single alternation, reusing earlier compilations."""
+        return re.compile('|'.join(f'(?:{p})' for p in patterns), flags)
+    
+    # Looked up by the current pattern lists, so patterns added at any time are included
+    @property
+    def _header_re(self) -> re.Pattern:
+        return self._combine(tuple(self.header_patterns), re.MULTILINE | re.DOTALL)
+    
+    @property
+    def _footer_re(self) -> re.Pattern:
+        return self._combine(tuple(self.footer_patterns), re.MULTILINE | re.DOTALL)
+    
+    @property
+    def _navigation_re(self) -> re.Pattern:
+        return self._combine(tuple(self.navigation_patterns), re.MULTILINE)
     
     def clean_document(self, content: str, preserve_structure: bool = True) -> str:
         """Clean a document by removing unwanted elements."""
         cleaned = content
         
-        # Remove header patterns
-        for pattern in self.header_patterns:
-            cleaned = re.sub(pattern, '', cleaned, flags=re.MULTILINE | re.DOTALL)
-        
-        # Remove footer patterns
-        for pattern in self.footer_patterns:
-            cleaned = re.sub(pattern, '', cleaned, flags=re.MULTILINE | re.DOTALL)
-        
-        # Remove navigation patterns
-        for pattern in self.navigation_patterns:
-            cleaned = re.sub(pattern, '', cleaned, flags=re.MULTILINE)
+        # Remove header, footer and navigation patterns
+        cleaned = self._header_re.sub('', cleaned)
+        cleaned = self._footer_re.sub('', cleaned)
+        cleaned = self._navigation_re.sub('', cleaned)
         
         # Clean up excessive whitespace
-        cleaned = re.sub(r'\n{3,}', '\n\n', cleaned)
-        cleaned = re.sub(r' {2,}', ' ', cleaned)
+        cleaned = self.MULTI_BLANK_RE.sub('\n\n', cleaned)
+        cleaned = self.MULTI_SPACE_RE.sub(' ', cleaned)
         
         # Remove empty bullet points
-        cleaned = re.sub(r'^\* *$', '', cleaned, flags=re.MULTILINE)
+        cleaned = self.EMPTY_BULLET_RE.sub('', cleaned)
         
         # Remove standalone navigation sections
-        cleaned = re.sub(r'^#{1,5} *(First steps|Models & pricing|Learn about Claude|Explore features|Agent components|Test & evaluate|Legal center)\n.*?(?=^#|\Z)', 
-                         '', cleaned, flags=re.MULTILINE | re.DOTALL)
+        cleaned = self.NAV_SECTION_RE.sub('', cleaned)
         
         if preserve_structure:
             # Preserve important markdown structure
@@ -151,19 +303,21 @@ class DocumentCleaner:
     
     def _preserve_important_structure(self, content: str) -> str:
         """Preserve important structural elements like headers and code blocks."""
-        # Ensure code blocks are preserved
-        code_blocks = re.findall(r'```[\s\S]*?```', content)
-        for i, block in enumerate(code_blocks):
-            placeholder = f"__CODE_BLOCK_{i}__"
-            content = content.replace(block, placeholder, 1)
+        # Stash code blocks behind placeholders so they keep their blank lines
+        code_blocks = []
+        
+        def stash(match: re.Match) -> str:
+            code_blocks.append(match.group(0))
+            return f"\x00{len(code_blocks) - 1}\x00"
+        
+        content = self.CODE_BLOCK_RE.sub(stash, content)
         
         # Clean content
-        content = re.sub(r'^\s*\n', '', content, flags=re.MULTILINE)
+        content = self.BLANK_LINE_RE.sub('', content)
         
         # Restore code blocks
-        for i, block in enumerate(code_blocks):
-            placeholder = f"__CODE_BLOCK_{i}__"
-            content = content.replace(placeholder, block)
+        if code_blocks:
+            content = self.STASHED_BLOCK_RE.sub(lambda m: code_blocks[int(m.group(1))], content)
         
         return content
     
@@ -172,13 +326,11 @@ class DocumentCleaner:
         if content.startswith('---'):
             try:
                 _, frontmatter, rest = content.split('---', 2)
-                metadata = yaml.safe_load(frontmatter)
+                metadata = _parse_frontmatter(frontmatter)
                 
-                # Convert any datetime objects to strings
-                if metadata:
-                    for key, value in metadata.items():
-                        if hasattr(value, 'isoformat'):  # Check if it's a datetime object
-                            metadata[key] = value.isoformat()
+                # Hand out a copy so callers cannot mutate the cached result
+                if isinstance(metadata, dict):
+                    metadata = dict(metadata)
                 
                 return metadata, rest
             except:
@@ -189,19 +341,26 @@ class DocumentCleaner:
 class DocumentStructurer:
     """Structures documents into hierarchical chunks optimized for embeddings."""
     
+    section_patterns = {
+        'h1': r'^# (.+)$',
+        'h2': r'^## (.+)$',
+        'h3': r'^### (.+)$',
+        'h4': r'^#### (.+)$',
+        'h5': r'^##### (.+)$',
+        'code': r'```[\s\S]*?```',
+        'list': r'^\* .+$',
+        'numbered_list': r'^\d+\. .+$',
+    }
+    
+    # Headers h1-h5; the level is the length of the first group
+    HEADER_RE = re.compile(r'^(#{1,5}) (.+)$', re.MULTILINE)
+    
+    # Fenced code blocks, captured so re.split keeps them
+    CODE_SPLIT_RE = re.compile(r'(```[\s\S]*?```)')
+    
     def __init__(self, chunk_size: int = 1000, chunk_overlap: int = 200):
         self.chunk_size = chunk_size
         self.chunk_overlap = chunk_overlap
-        self.section_patterns = {
-            'h1': r'^# (.+)$',
-            'h2': r'^## (.+)$',
-            'h3': r'^### (.+)$',
-            'h4': r'^#### (.+)$',
-            'h5': r'^##### (.+)$',
-            'code': r'```[\s\S]*?```',
-            'list': r'^\* .+$',
-            'numbered_list': r'^\d+\. .+$',
-        }
     
     def structure_document(self, content: str, metadata: Dict[str, Any]) -> List[DocumentChunk]:
         """Structure document into semantic chunks."""
@@ -230,50 +389,36 @@ class DocumentStructurer:
     
     def _parse_sections(self, content: str) -> List[Dict[str, Any]]:
         """Parse document into hierarchical sections."""
-        lines = content.split('\n')
         sections = []
         current_section = {
             'level': 0,
             'title': 'Introduction',
-            'content': [],
             'metadata': {}
         }
-        
-        for line in lines:
-            # Check for headers
-            header_match = None
-            header_level = 0
-            
-            for level in range(1, 6):
-                pattern = f'^{"#" * level} (.+)$'
-                match = re.match(pattern, line)
-                if match:
-                    header_match = match
-                    header_level = level
-                    break
+        section_start = 0
+        
+        # Scan all header lines at once and slice section bodies between them
+        for header_match in self.HEADER_RE.finditer(content):
+            # Save current section if any lines precede this header
+            if header_match.start() > section_start:
+                current_section['content'] = content[section_start:header_match.start() - 1]
+                sections.append(current_section)
             
-            if header_match:
-                # Save current section if it has content
-                if current_section['content']:
-                    current_section['content'] = '\n'.join(current_section['content'])
-                    sections.append(current_section)
-                
-                # Start new section
-                current_section = {
-                    'level': header_level,
-                    'title': header_match.group(1),
-                    'content': [],
-                    'metadata': {
-                        'section_level': header_level,
-                        'section_title': header_match.group(1)
-                    }
+            # Start new section
+            header_level = len(header_match.group(1))
+            current_section = {
+                'level': header_level,
+                'title': header_match.group(2),
+                'metadata': {
+                    'section_level': header_level,
+                    'section_title': header_match.group(2)
                 }
-            else:
-                current_section['content'].append(line)
+            }
+            section_start = header_match.end() + 1
         
         # Add final section
-        if current_section['content']:
-            current_section['content'] = '\n'.join(current_section['content'])
+        if section_start <= len(content):
+            current_section['content'] = content[section_start:]
             sections.append(current_section)
         
         return sections
@@ -286,73 +431,59 @@ class DocumentStructurer:
         if not content.strip():
             return chunks
         
-        # Handle code blocks specially
-        code_blocks = re.findall(r'```[\s\S]*?```', content)
-        for code_block in code_blocks:
-            content = content.replace(code_block, f"__CODE_BLOCK_{len(chunks)}__")
-            
-            # Create chunk for code block
-            chunk_id = hashlib.md5(code_block.encode()).hexdigest()[:8]
-            chunk = DocumentChunk(
-                content=code_block,
-                metadata={**section_metadata, 'type': 'code'},
-                chunk_id=chunk_id,
-                parent_doc='',
-                position=len(chunks),
-                tokens=len(code_block.split())
-            )
-            chunks.append(chunk)
-        
-        # Split remaining content into chunks
-        words = content.split()
-        current_chunk = []
-        current_size = 0
-        
-        for word in words:
-            current_chunk.append(word)
-            current_size += 1
-            
-            if current_size >= self.chunk_size:
-                chunk_content = ' '.join(current_chunk)
-                
-                # Restore code blocks
-                for i, code_block in enumerate(code_blocks):
-                    chunk_content = chunk_content.replace(f"__CODE_BLOCK_{i}__", code_block)
-                
-                chunk_id = hashlib.md5(chunk_content.encode()).hexdigest()[:8]
+        # Split around code blocks: odd parts are the blocks themselves
+        words = []
+        attach = False  # True when the next part continues the previous word
+        for i, part in enumerate(self.CODE_SPLIT_RE.split(content)):
+            if i % 2:
+                # Create chunk for code block
+                chunk_id = generate_chunk_id(part)
                 chunk = DocumentChunk(
-                    content=chunk_content,
-                    metadata={**section_metadata, 'type': 'text'},
+                    content=part,
+                    metadata={**section_metadata, 'type': 'code'},
                     chunk_id=chunk_id,
                     parent_doc='',
                     position=len(chunks),
-                    tokens=current_size
+                    tokens=len(part.split())
                 )
                 chunks.append(chunk)
                 
-                # Overlap for next chunk
-                overlap_size = min(self.chunk_overlap, len(current_chunk))
-                current_chunk = current_chunk[-overlap_size:]
-                current_size = overlap_size
-        
-        # Add remaining content as final chunk
-        if current_chunk:
-            chunk_content = ' '.join(current_chunk)
-            
-            # Restore code blocks
-            for i, code_block in enumerate(code_blocks):
-                chunk_content = chunk_content.replace(f"__CODE_BLOCK_{i}__", code_block)
+                # The block also stays inline in the text, as a single word
+                if attach and words:
+                    words[-1] += part
+                else:
+                    words.append(part)
+                attach = True
+            elif part:
+                part_words = part.split()
+                if part_words and attach and words and not part[0].isspace():
+                    words[-1] += part_words.pop(0)
+                words.extend(part_words)
+                attach = not part[-1].isspace()
+        
+        # Split text into overlapping word windows
+        step = max(self.chunk_size - self.chunk_overlap, 1)
+        
+        start = 0
+        while start < len(words):
+            window = words[start:start + self.chunk_size]
             
-            chunk_id = hashlib.md5(chunk_content.encode()).hexdigest()[:8]
+            chunk_content = ' '.join(window)
+            chunk_id = generate_chunk_id(chunk_content)
             chunk = DocumentChunk(
                 content=chunk_content,
                 metadata={**section_metadata, 'type': 'text'},
                 chunk_id=chunk_id,
                 parent_doc='',
                 position=len(chunks),
-                tokens=current_size
+                tokens=len(window)
             )
             chunks.append(chunk)
+            
+            # A window running past the end is the final chunk
+            if start + self.chunk_size > len(words):
+                break
+            start += step
         
         return chunks
 
@@ -360,12 +491,36 @@ class DocumentStructurer:
 class DocumentSorter:
     """Sorts documents using LLM-based classification and clustering."""
     
-    def __init__(self, api_key: Optional[str] = None):
+    CATEGORY_DESCRIPTIONS = """
+        - getting_started: Introduction, setup, installation guides
+        - concepts: Core concepts, architecture, principles
+        - guides: How-to guides, tutorials, walkthroughs
+        - api_reference: API documentation, method references
+        - examples: Code examples, demos, samples
+        - advanced: Advanced topics, optimization, scaling
+        - troubleshooting: Error handling, debugging, common issues"""
+    
+    MODEL = "gpt-3.5-turbo"
+    
+    def __init__(self, api_key: Optional[str] = None, max_concurrency: int = 20, batch_size: int = 25):
         self.api_key = api_key
         self.client = None
         if api_key:
             self.client = AsyncOpenAI(api_key=api_key)
         
+        # Bounds the number of classification requests in flight
+        self._sem = asyncio.Semaphore(max_concurrency)
+        
+        # Number of documents classified per LLM request
+        self.batch_size = batch_size
+        
+        # Route classification through the OpenAI Batch API (cheaper, not interactive)
+        self.use_batch_api = False
+        self.on_status: Optional[Callable[[str], None]] = None
+        
+        # LLM answers for documents classified before; set to None to disable
+        self.classification_cache: Optional[ClassificationCache] = ClassificationCache()
+        
         self.categories = {
             'getting_started': ['introduction', 'quickstart', 'setup', 'installation'],
             'concepts': ['overview', 'concepts', 'architecture', 'principles'],
@@ -376,61 +531,152 @@ class DocumentSorter:
             'troubleshooting': ['troubleshooting', 'errors', 'debugging', 'issues']
         }
     
-    @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=4, max=10))
     async def classify_document(self, doc: ProcessedDocument) -> str:
-        """Classify document using LLM."""
-        if not self.client:
-            return self._rule_based_classification(doc)
+        """Classify a single document.
         
+        Kept as public API; it goes through classify_batch so there is one prompt and parser.
+        """
+        return (await self.classify_batch([doc]))[0]
+    
+    def _batch_request(self, docs: List[ProcessedDocument]) -> Dict[str, Any]:
+        """Build the chat completion parameters for classifying several documents together."""
+        listing = '\n'.join(
+            f"""
+        {i}. Document Title: {doc.title}
+           Document URL: {doc.original_url}
+           First 500 characters: {doc.chunks[0].content[:500] if doc.chunks else ''}"""
+            for i, doc in enumerate(docs, 1)
+        )
         prompt = f"""
-        Classify the following documentation into one of these categories:
-        - getting_started: Introduction, setup, installation guides
-        - concepts: Core concepts, architecture, principles
-        - guides: How-to guides, tutorials, walkthroughs
-        - api_reference: API documentation, method references
-        - examples: Code examples, demos, samples
-        - advanced: Advanced topics, optimization, scaling
-        - troubleshooting: Error handling, debugging, common issues
+        Classify each of the following documents into one of these categories:{self.CATEGORY_DESCRIPTIONS}
+        {listing}
         
-        Document Title: {doc.title}
-        Document URL: {doc.original_url}
-        First 500 characters: {doc.chunks[0].content[:500] if doc.chunks else ''}
-        
-        Return only the category name.
+        Return only a JSON object mapping each document number to its category name,
+        for example {{"1": "guides", "2": "concepts"}}.
         """
         
+        return {
+            "model": self.MODEL,
+            "messages": [
+                {"role": "system", "content": "You are a documentation classifier."},
+                {"role": "user", "content": prompt}
+            ],
+            "response_format": {"type": "json_object"},
+            "temperature": 0.1,
+            "max_tokens": 20 * len(docs) + 20
+        }
+    
+    def _parse_batch_answers(self, docs: List[ProcessedDocument], content: Optional[str]) -> List[str]:
+        """Map a JSON batch answer back onto documents."""
         try:
-            response = await self.client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": "You are a documentation classifier."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.1,
-                max_tokens=50
-            )
-            
-            category = response.choices[0].message.content.strip().lower()
+            answers = json.loads(content) if content else {}
+        except ValueError as e:
+            logger.error(f"Could not parse LLM batch answer: {e}")
+            answers = {}
+        if not isinstance(answers, dict):
+            answers = {}
+        
+        # Anything missing or unrecognised falls back to the rules
+        categories = []
+        answered = []
+        for i, doc in enumerate(docs, 1):
+            category = str(answers.get(str(i), '')).strip().lower()
             if category in self.categories:
-                return category
+                answered.append((self._classification_key(doc), category))
             else:
-                return self._rule_based_classification(doc)
-                
+                category = self._rule_based_classification(doc)
+            categories.append(category)
+        
+        # Only LLM answers are worth remembering
+        if answered and self.classification_cache is not None:
+            self.classification_cache.put_many(answered)
+        return categories
+    
+    def _classification_key(self, doc: ProcessedDocument) -> str:
+        """Hash everything the LLM sees when classifying a document."""
+        snippet = doc.chunks[0].content[:500] if doc.chunks else ''
+        text = '\x00'.join((self.MODEL, self.CATEGORY_DESCRIPTIONS, doc.title, doc.original_url, snippet))
+        return hashlib.sha256(text.encode('utf-8')).hexdigest()
+    
+    async def classify_batch(self, docs: List[ProcessedDocument]) -> List[str]:
+        """Classify several documents with a single LLM request."""
+        if not self.client:
+            return [self._rule_based_classification(doc) for doc in docs]
+        
+        try:
+            async with self._sem:
+                response = await self.client.chat.completions.create(**self._batch_request(docs))
+            content = response.choices[0].message.content
+        except Exception as e:
+            logger.error(f"LLM batch classification failed: {e}")
+            content = None
+        
+        return self._parse_batch_answers(docs, content)
+    
+    async def classify_with_batch_api(self, batches: List[List[ProcessedDocument]]) -> List[List[str]]:
+        """Classify batches of documents through the OpenAI Batch API."""
+        requests = [
+            {
+                "custom_id": f"batch-{i}",
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": self._batch_request(batch)
+            }
+            for i, batch in enumerate(batches)
+        ]
+        
+        def report_status(batch) -> None:
+            counts = batch.request_counts
+            done = f" ({counts.completed}/{counts.total} requests done)" if counts else ""
+            self._report(f"OpenAI batch {batch.id}: {batch.status}{done}")
+        
+        try:
+            batch_id = await submit_batch(self.client, requests)
+            self._report(f"Submitted {len(requests)} classification requests as OpenAI batch {batch_id}")
+            bodies = await await_batch(self.client, batch_id, on_status=report_status)
         except Exception as e:
-            logger.error(f"LLM classification failed: {e}")
-            return self._rule_based_classification(doc)
+            logger.error(f"Batch API classification failed: {e}")
+            bodies = {}
+        
+        results = []
+        for i, batch in enumerate(batches):
+            body = bodies.get(f"batch-{i}")
+            content = body['choices'][0]['message']['content'] if body else None
+            results.append(self._parse_batch_answers(batch, content))
+        return results
+    
+    def _report(self, message: str) -> None:
+        """Log a progress message and forward it to the status callback."""
+        logger.info(message)
+        if self.on_status:
+            self.on_status(message)
+    
+    @functools.cached_property
+    def _category_re(self) -> Tuple[re.Pattern, List[str]]:
+        """Compile every category's keywords into one alternation, one group per category."""
+        group_categories = [category for category, keywords in self.categories.items() if keywords]
+        groups = '|'.join(
+            '(' + '|'.join(re.escape(keyword) for keyword in self.categories[category]) + ')'
+            for category in group_categories
+        )
+        # The lookahead reports keyword matches that overlap as well
+        return re.compile(f'(?=(?:{groups}))'), group_categories
     
     def _rule_based_classification(self, doc: ProcessedDocument) -> str:
         """Fallback rule-based classification."""
-        title_lower = doc.title.lower()
-        url_lower = doc.original_url.lower()
-        
-        # Check each category's keywords
-        for category, keywords in self.categories.items():
-            for keyword in keywords:
-                if keyword in title_lower or keyword in url_lower:
-                    return category
+        pattern, group_categories = self._category_re
+        text = f"{doc.title.lower()}\n{doc.original_url.lower()}"
+        
+        # Earlier categories take priority wherever their keywords occur
+        best = None
+        for match in pattern.finditer(text):
+            if best is None or match.lastindex < best:
+                best = match.lastindex
+                if best == 1:
+                    break
         
+        if best is not None:
+            return group_categories[best - 1]
         return 'guides'  # Default category
     
     def create_dependency_graph(self, documents: List[ProcessedDocument]) -> nx.DiGraph:
@@ -442,45 +688,101 @@ class DocumentSorter:
             graph.add_node(doc.file_path, doc=doc)
         
         # Add edges based on references
+        find_references = self._build_reference_finder(documents)
         for doc in documents:
             content = ' '.join([chunk.content for chunk in doc.chunks])
             
-            # Look for references to other documents
-            for other_doc in documents:
+            # Look for URL or title references to other documents
+            for i in find_references(content):
+                other_doc = documents[i]
                 if doc.file_path != other_doc.file_path:
-                    # Check for URL references
-                    if other_doc.original_url in content:
-                        graph.add_edge(doc.file_path, other_doc.file_path)
-                    
-                    # Check for title references
-                    if other_doc.title in content:
-                        graph.add_edge(doc.file_path, other_doc.file_path)
+                    graph.add_edge(doc.file_path, other_doc.file_path)
         
         return graph
     
+    def _build_reference_finder(self, documents: List[ProcessedDocument]) -> Callable[[str], List[int]]:
+        """Return a function listing the indices of documents referenced in a text."""
+        # Group documents by each distinct URL/title so every string is searched once
+        targets = defaultdict(set)
+        always_referenced = set()  # An empty URL or title occurs in every text
+        for i, doc in enumerate(documents):
+            for reference in (doc.original_url, doc.title):
+                if reference:
+                    targets[reference].add(i)
+                else:
+                    always_referenced.add(i)
+        
+        if ahocorasick is None or not targets:
+            def find_references(content: str) -> List[int]:
+                found = set(always_referenced)
+                for reference, indices in targets.items():
+                    if reference in content:
+                        found.update(indices)
+                return sorted(found)
+            return find_references
+        
+        # One automaton over every URL and title, so each text is scanned once
+        automaton = ahocorasick.Automaton()
+        for reference, indices in targets.items():
+            automaton.add_word(reference, tuple(indices))
+        automaton.make_automaton()
+        
+        def find_references(content: str) -> List[int]:
+            found = set(always_referenced)
+            for _, indices in automaton.iter(content):
+                found.update(indices)
+            return sorted(found)
+        
+        return find_references
+    
     def calculate_complexity_scores(self, documents: List[ProcessedDocument]) -> None:
         """Calculate complexity scores for documents."""
-        for doc in documents:
-            # Factors for complexity
-            total_tokens = sum(chunk.tokens for chunk in doc.chunks)
-            code_chunks = sum(1 for chunk in doc.chunks if chunk.metadata.get('type') == 'code')
-            avg_chunk_size = total_tokens / len(doc.chunks) if doc.chunks else 0
-            
-            # Calculate complexity score (0-1)
-            complexity = min(1.0, (
-                (total_tokens / 10000) * 0.3 +  # Document length
-                (code_chunks / max(len(doc.chunks), 1)) * 0.3 +  # Code density
-                (avg_chunk_size / 1000) * 0.2 +  # Chunk complexity
-                (len(doc.dependencies) / 10) * 0.2  # Dependencies
-            ))
-            
-            doc.complexity_score = complexity
+        # Factors for complexity, one array entry per document
+        total_tokens = np.array([sum(chunk.tokens for chunk in doc.chunks) for doc in documents], dtype=np.float64)
+        code_chunks = np.array([
+            sum(1 for chunk in doc.chunks if chunk.metadata.get('type') == 'code') for doc in documents
+        ], dtype=np.float64)
+        chunk_counts = np.maximum(np.array([len(doc.chunks) for doc in documents], dtype=np.float64), 1)
+        dependencies = np.array([len(doc.dependencies) for doc in documents], dtype=np.float64)
+        avg_chunk_size = total_tokens / chunk_counts
+        
+        # Calculate complexity scores (0-1)
+        complexity = np.minimum(1.0, (
+            (total_tokens / 10000) * 0.3 +  # Document length
+            (code_chunks / chunk_counts) * 0.3 +  # Code density
+            (avg_chunk_size / 1000) * 0.2 +  # Chunk complexity
+            (dependencies / 10) * 0.2  # Dependencies
+        ))
+        
+        for doc, score in zip(documents, complexity):
+            doc.complexity_score = float(score)
     
     async def sort_documents(self, documents: List[ProcessedDocument]) -> List[ProcessedDocument]:
         """Sort documents for optimal learning/embedding order."""
-        # Classify documents
-        for doc in documents:
-            doc.category = await self.classify_document(doc)
+        # Reuse earlier LLM answers for documents that have not changed
+        pending = documents
+        if self.client and self.classification_cache is not None:
+            keys = [self._classification_key(doc) for doc in documents]
+            cached = self.classification_cache.get_many(keys)
+            pending = []
+            for doc, key in zip(documents, keys):
+                if cached.get(key) in self.categories:
+                    doc.category = cached[key]
+                else:
+                    pending.append(doc)
+            if len(pending) < len(documents):
+                self._report(f"Reused {len(documents) - len(pending)} cached classifications")
+        
+        # Classify the rest in batches, sending the batches concurrently
+        batch_size = max(self.batch_size, 1)
+        batches = [pending[i:i + batch_size] for i in range(0, len(pending), batch_size)]
+        if self.client and self.use_batch_api and batches:
+            results = await self.classify_with_batch_api(batches)
+        else:
+            results = await asyncio.gather(*(self.classify_batch(batch) for batch in batches))
+        for batch, categories in zip(batches, results):
+            for doc, category in zip(batch, categories):
+                doc.category = category
         
         # Create dependency graph
         dep_graph = self.create_dependency_graph(documents)
@@ -518,6 +820,7 @@ class DocumentSorter:
             category_docs[doc.category].append(doc)
         
         # Sort within each category based on dependencies
+        by_path = {doc.file_path: doc for doc in documents}
         sorted_docs = []
         for category in ['getting_started', 'concepts', 'guides', 
                         'api_reference', 'examples', 'advanced', 'troubleshooting']:
@@ -529,9 +832,7 @@ class DocumentSorter:
                 # Topological sort within category
                 try:
                     sorted_files = list(nx.topological_sort(subgraph))
-                    for file_path in sorted_files:
-                        doc = next(d for d in category_docs[category] if d.file_path == file_path)
-                        sorted_docs.append(doc)
+                    sorted_docs.extend(by_path[file_path] for file_path in sorted_files)
                 except nx.NetworkXUnfeasible:
                     # If there are cycles, just use the original order
                     sorted_docs.extend(category_docs[category])
@@ -539,19 +840,69 @@ class DocumentSorter:
         return sorted_docs
 
 
+def clean_and_chunk(cleaner: 'DocumentCleaner', structurer: 'DocumentStructurer',
+                    file_path: Path, data: bytes) -> Optional[ProcessedDocument]:
+    """Clean and chunk a single document, or return None if nothing is left after cleaning.
+    
+    Kept at module level so it can run in a worker process.
+    """
+    content = data.decode('utf-8')
+    
+    # Match the newline translation of reading in text mode
+    if '\r' in content:
+        content = content.replace('\r\n', '\n').replace('\r', '\n')
+    
+    # Extract metadata and clean
+    metadata, raw_content = cleaner.extract_metadata(content)
+    cleaned_content = cleaner.clean_document(raw_content)
+    
+    # Skip if no content after cleaning
+    if not cleaned_content.strip():
+        return None
+    
+    # Create processed document
+    doc = ProcessedDocument(
+        file_path=str(file_path),
+        original_url=metadata.get('url', ''),
+        title=metadata.get('title', file_path.stem)
+    )
+    
+    # Structure into chunks
+    doc.chunks = structurer.structure_document(cleaned_content, metadata)
+    
+    # Set parent document for chunks
+    for chunk in doc.chunks:
+        chunk.parent_doc = str(file_path)
+    
+    return doc
+
+
 class DocumentPostProcessor:
     """Main post-processor that orchestrates cleaning, structuring, and sorting."""
     
-    def __init__(self, input_dir: str, output_dir: str, api_key: Optional[str] = None):
+    def __init__(self, input_dir: str, output_dir: str, api_key: Optional[str] = None,
+                 max_concurrency: Optional[int] = None):
         self.input_dir = Path(input_dir)
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(exist_ok=True)
         
         self.cleaner = DocumentCleaner()
         self.structurer = DocumentStructurer()
-        self.sorter = DocumentSorter(api_key)
+        if max_concurrency:
+            self.sorter = DocumentSorter(api_key, max_concurrency=max_concurrency)
+        else:
+            self.sorter = DocumentSorter(api_key)
         
         self.processed_docs: List[ProcessedDocument] = []
+        
+        # Number of files (and, if given, LLM requests) in flight at the same time
+        self.max_concurrency = max_concurrency or (os.cpu_count() or 1) * 2
+        
+        # Persistent cache of processed documents, open while processing
+        self._cache: Optional[shelve.Shelf] = None
+        
+        # Worker processes for cleaning and chunking, running while processing
+        self._pool: Optional[ProcessPoolExecutor] = None
     
     async def process_all_documents(self, recursive: bool = True, flatten_output: bool = True) -> Dict[str, Any]:
         """Process all documents in the input directory.
@@ -563,34 +914,52 @@ class DocumentPostProcessor:
         logger.info(f"Starting post-processing of documents in {self.input_dir}")
         logger.info(f"Recursive: {recursive}, Flatten output: {flatten_output}")
         
-        # Find all markdown files
-        if recursive:
-            md_files = list(self.input_dir.rglob("*.md"))  # Recursive glob
-        else:
-            md_files = list(self.input_dir.glob("*.md"))  # Non-recursive
-            
-        # Exclude summary files
-        md_files = [f for f in md_files if not f.name.startswith('_')]
-        
-        logger.info(f"Found {len(md_files)} markdown files to process")
-        
         # Track source folders for organization
         source_folders = defaultdict(list)
         
-        # Process each file
-        for md_file in md_files:
+        # Process files concurrently, keeping results in discovery order
+        sem = asyncio.Semaphore(self.max_concurrency)
+        
+        async def process_one(md_file: Path) -> Optional[ProcessedDocument]:
+            async with sem:
+                return await self.process_document(md_file)
+        
+        # Reuse results for files processed unchanged by an earlier run
+        # Clean and chunk in worker processes so the event loop stays free
+        with shelve.open(str(self.output_dir / PROCESS_CACHE_NAME)) as cache, \
+                ProcessPoolExecutor(max_workers=os.cpu_count()) as pool:
+            self._cache = cache
+            self._pool = pool
             try:
-                processed_doc = await self.process_document(md_file)
-                if processed_doc:
-                    self.processed_docs.append(processed_doc)
-                    
-                    # Track source folder
-                    relative_path = md_file.relative_to(self.input_dir)
-                    source_folder = relative_path.parent if relative_path.parent != Path('.') else Path('root')
-                    source_folders[str(source_folder)].append(processed_doc)
-                    
-            except Exception as e:
-                logger.error(f"Error processing {md_file}: {e}")
+                # Start on each markdown file as soon as the walk finds it
+                md_files = []
+                tasks = []
+                try:
+                    async for md_file in aiter_markdown_files(self.input_dir, recursive=recursive):
+                        md_files.append(md_file)
+                        tasks.append(asyncio.create_task(process_one(md_file)))
+                except BaseException:
+                    for task in tasks:
+                        task.cancel()
+                    await asyncio.gather(*tasks, return_exceptions=True)
+                    raise
+                
+                logger.info(f"Found {len(md_files)} markdown files to process")
+                results = await asyncio.gather(*tasks, return_exceptions=True)
+            finally:
+                self._cache = None
+                self._pool = None
+        
+        for md_file, processed_doc in zip(md_files, results):
+            if isinstance(processed_doc, Exception):
+                logger.error(f"Error processing {md_file}: {processed_doc}")
+            elif processed_doc:
+                self.processed_docs.append(processed_doc)
+                
+                # Track source folder
+                relative_path = md_file.relative_to(self.input_dir)
+                source_folder = relative_path.parent if relative_path.parent != Path('.') else Path('root')
+                source_folders[str(source_folder)].append(processed_doc)
         
         # Sort documents
         logger.info("Sorting documents...")
@@ -598,43 +967,57 @@ class DocumentPostProcessor:
         
         # Save processed documents
         logger.info("Saving processed documents...")
-        summary = self.save_processed_documents(flatten_output=flatten_output, source_folders=dict(source_folders))
+        summary = await asyncio.to_thread(
+            self.save_processed_documents, flatten_output=flatten_output, source_folders=dict(source_folders)
+        )
         
         return summary
     
     async def process_document(self, file_path: Path) -> Optional[ProcessedDocument]:
-        """Process a single document."""
+        """Process a single document in a worker process, or a thread outside process_all_documents."""
         logger.info(f"Processing: {file_path}")
+        data, key = await asyncio.to_thread(self._read_document, file_path)
+        
+        # The cache is only touched from the event loop thread
+        if self._cache is not None and key in self._cache:
+            stored = json.loads(self._cache[key])
+            if stored is None:
+                logger.warning(f"No content after cleaning: {file_path}")
+                return None
+            return ProcessedDocument.from_dict(stored)
+        
+        if self._pool is not None:
+            loop = asyncio.get_running_loop()
+            doc = await loop.run_in_executor(
+                self._pool, clean_and_chunk, self.cleaner, self.structurer, file_path, data
+            )
+        else:
+            doc = await asyncio.to_thread(clean_and_chunk, self.cleaner, self.structurer, file_path, data)
         
-        # Read file
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        # Extract metadata and clean
-        metadata, raw_content = self.cleaner.extract_metadata(content)
-        cleaned_content = self.cleaner.clean_document(raw_content)
-        
-        # Skip if no content after cleaning
-        if not cleaned_content.strip():
+        if doc is None:
             logger.warning(f"No content after cleaning: {file_path}")
-            return None
-        
-        # Create processed document
-        doc = ProcessedDocument(
-            file_path=str(file_path),
-            original_url=metadata.get('url', ''),
-            title=metadata.get('title', file_path.stem)
-        )
-        
-        # Structure into chunks
-        doc.chunks = self.structurer.structure_document(cleaned_content, metadata)
-        
-        # Set parent document for chunks
-        for chunk in doc.chunks:
-            chunk.parent_doc = str(file_path)
-        
+        if self._cache is not None:
+            self._cache[key] = encode_json(doc.to_dict() if doc else None)
         return doc
     
+    def _read_document(self, file_path: Path) -> Tuple[bytes, str]:
+        """Read a document and derive its processing cache key."""
+        data = file_path.read_bytes()
+        
+        # Anything that changes the processed result belongs in the key
+        settings = (
+            PROCESS_CACHE_VERSION,
+            str(file_path),
+            self.structurer.chunk_size,
+            self.structurer.chunk_overlap,
+            self.cleaner.header_patterns,
+            self.cleaner.footer_patterns,
+            self.cleaner.navigation_patterns,
+        )
+        digest = hashlib.blake2b(data, digest_size=16)
+        digest.update(repr(settings).encode())
+        return data, digest.hexdigest()
+    
     def save_processed_documents(self, flatten_output: bool = True, source_folders: Dict[str, List] = None) -> Dict[str, Any]:
         """Save processed documents to output directory.
         
@@ -658,21 +1041,20 @@ class DocumentPostProcessor:
         
         # Save each document
         for i, doc in enumerate(self.processed_docs):
+            # Resolve the source path once per document
+            source_path = Path(doc.file_path)
+            in_input_dir = self.input_dir in source_path.parents
+            relative_path = source_path.relative_to(self.input_dir) if in_input_dir else Path(source_path.name)
+            source_folder = str(source_path.parent.relative_to(self.input_dir)) if in_input_dir else 'root'
+            
             # Determine output filename
-            if flatten_output:
+            path_parts = relative_path.parts[:-1] if flatten_output else ()  # Exclude filename
+            if path_parts:
                 # Create a unique filename that preserves some path info
-                relative_path = Path(doc.file_path).relative_to(self.input_dir) if self.input_dir in Path(doc.file_path).parents else Path(doc.file_path).name
-                path_parts = list(relative_path.parts[:-1])  # Exclude filename
-                
-                if path_parts:
-                    # Include folder structure in filename
-                    folder_prefix = "_".join(path_parts).replace("/", "_").replace("\\", "_")
-                    filename_stem = f"{i:04d}_{folder_prefix}_{Path(doc.file_path).stem}"
-                else:
-                    filename_stem = f"{i:04d}_{Path(doc.file_path).stem}"
+                folder_prefix = "_".join(path_parts).replace("/", "_").replace("\\", "_")
+                filename_stem = f"{i:04d}_{folder_prefix}_{source_path.stem}"
             else:
-                # Preserve original folder structure
-                filename_stem = f"{i:04d}_{Path(doc.file_path).stem}"
+                filename_stem = f"{i:04d}_{source_path.stem}"
             
             # Save cleaned full document
             cleaned_path = self.output_dir / 'cleaned' / f"{filename_stem}.md"
@@ -686,14 +1068,10 @@ class DocumentPostProcessor:
                 f.write(f"**Source File**: {doc.file_path}\n\n")
                 f.write(full_content)
             
-            # Save chunks
-            chunk_dir = self.output_dir / 'chunks' / filename_stem
-            chunk_dir.mkdir(exist_ok=True, parents=True)
-            
-            for j, chunk in enumerate(doc.chunks):
-                chunk_path = chunk_dir / f"chunk_{j:03d}.json"
-                with open(chunk_path, 'w', encoding='utf-8') as f:
-                    json.dump(chunk.to_dict(), f, indent=2)
+            # Save chunks as one JSON Lines file per document
+            chunk_path = self.output_dir / 'chunks' / f"{filename_stem}.jsonl"
+            with open(chunk_path, 'wb') as f:
+                f.writelines(encode_json(chunk.to_dict()) + b'\n' for chunk in doc.chunks)
             
             # Update summary
             summary['total_chunks'] += len(doc.chunks)
@@ -709,34 +1087,35 @@ class DocumentPostProcessor:
                 'chunks': len(doc.chunks),
                 'complexity': doc.complexity_score,
                 'dependencies': doc.dependencies,
-                'source_folder': str(Path(doc.file_path).parent.relative_to(self.input_dir)) if self.input_dir in Path(doc.file_path).parents else 'root'
+                'source_folder': source_folder
             })
         
         # Save summary
         summary_path = self.output_dir / 'processing_summary.json'
-        with open(summary_path, 'w', encoding='utf-8') as f:
-            json.dump(summary, f, indent=2)
+        dump_json(summary, summary_path)
         
-        # Save sorted index for vector DB
+        # Save sorted index for vector DB, streaming one record per line
+        # instead of building the whole index in memory first
         index_path = self.output_dir / 'vector_db_index.json'
-        vector_index = []
-        
-        for doc in self.processed_docs:
-            for chunk in doc.chunks:
-                vector_index.append({
-                    'chunk_id': chunk.chunk_id,
-                    'content': chunk.content,
-                    'metadata': {
-                        **chunk.metadata,
-                        'category': doc.category,
-                        'complexity': doc.complexity_score,
-                        'parent_title': doc.title,
-                        'source_file': doc.file_path
-                    }
-                })
-        
-        with open(index_path, 'w', encoding='utf-8') as f:
-            json.dump(vector_index, f, indent=2)
+        with open(index_path, 'wb') as f:
+            f.write(b'[')
+            separator = b'\n'
+            for doc in self.processed_docs:
+                for chunk in doc.chunks:
+                    f.write(separator)
+                    f.write(encode_json({
+                        'chunk_id': chunk.chunk_id,
+                        'content': chunk.content,
+                        'metadata': {
+                            **chunk.metadata,
+                            'category': doc.category,
+                            'complexity': doc.complexity_score,
+                            'parent_title': doc.title,
+                            'source_file': doc.file_path
+                        }
+                    }))
+                    separator = b',\n'
+            f.write(b'\n]\n')
         
         logger.info(f"Processing complete! Summary saved to {summary_path}")
         return summary
@@ -745,7 +1124,6 @@ class DocumentPostProcessor:
 async def main():
     """Main entry point."""
     import sys
-    import os
     from dotenv import load_dotenv
     
     load_dotenv()
@@ -14,9 +14,13 @@ import json
 import queue
 
 from DocPostProcessor import DocumentPostProcessor
+from classification_cache import ClassificationCache
 
 
 class DocPostProcessorGUI:
+    # Lines kept in the log widget
+    MAX_LOG_LINES = 5000
+    
     def __init__(self, root):
         self.root = root
         self.root.title("Documentation Post-Processor")
@@ -34,9 +38,9 @@ class DocPostProcessorGUI:
         self.setup_styles()
         self.setup_ui()
         
-        # Center window and start checking for messages
+        # Center window and drain the message queue whenever a message is posted
         self.center_window()
-        self.check_messages()
+        self.root.bind("<<QueueMessage>>", self.check_messages)
     
     def setup_styles(self):
         """Configure modern styling for the GUI."""
@@ -119,6 +123,20 @@ class DocPostProcessorGUI:
         self.chunk_size_spinbox.grid(row=0, column=1, sticky=tk.W, pady=5, padx=(10, 0))
         ttk.Label(options_frame, text="tokens").grid(row=0, column=2, sticky=tk.W, padx=(5, 0))
         
+        # LLM Batch Size
+        ttk.Label(options_frame, text="Batch Size:").grid(row=0, column=3, sticky=tk.W, pady=5, padx=(20, 0))
+        self.batch_size_var = tk.IntVar(value=25)
+        self.batch_size_spinbox = ttk.Spinbox(
+            options_frame, 
+            from_=1, 
+            to=100, 
+            increment=5,
+            textvariable=self.batch_size_var,
+            width=10
+        )
+        self.batch_size_spinbox.grid(row=0, column=4, sticky=tk.W, pady=5, padx=(10, 0))
+        ttk.Label(options_frame, text="docs per LLM request").grid(row=0, column=5, sticky=tk.W, padx=(5, 0))
+        
         # Chunk Overlap
         ttk.Label(options_frame, text="Chunk Overlap:").grid(row=1, column=0, sticky=tk.W, pady=5)
         self.chunk_overlap_var = tk.IntVar(value=200)
@@ -133,6 +151,20 @@ class DocPostProcessorGUI:
         self.chunk_overlap_spinbox.grid(row=1, column=1, sticky=tk.W, pady=5, padx=(10, 0))
         ttk.Label(options_frame, text="tokens").grid(row=1, column=2, sticky=tk.W, padx=(5, 0))
         
+        # Max Concurrency
+        ttk.Label(options_frame, text="Max Concurrency:").grid(row=1, column=3, sticky=tk.W, pady=5, padx=(20, 0))
+        self.max_concurrency_var = tk.IntVar(value=20)
+        self.max_concurrency_spinbox = ttk.Spinbox(
+            options_frame, 
+            from_=1, 
+            to=100, 
+            increment=5,
+            textvariable=self.max_concurrency_var,
+            width=10
+        )
+        self.max_concurrency_spinbox.grid(row=1, column=4, sticky=tk.W, pady=5, padx=(10, 0))
+        ttk.Label(options_frame, text="files / LLM requests").grid(row=1, column=5, sticky=tk.W, padx=(5, 0))
+        
         # Process Subfolders
         self.process_subfolders_var = tk.BooleanVar(value=True)
         self.process_subfolders_check = ttk.Checkbutton(
@@ -166,6 +198,14 @@ class DocPostProcessorGUI:
         self.api_key_var = tk.StringVar()
         self.api_key_entry = ttk.Entry(options_frame, textvariable=self.api_key_var, show="*", width=40)
         
+        # Use OpenAI Batch API (hidden by default)
+        self.use_batch_api_var = tk.BooleanVar(value=False)
+        self.use_batch_api_check = ttk.Checkbutton(
+            options_frame,
+            text="Use Batch API (50% cheaper, results can take up to 24h)",
+            variable=self.use_batch_api_var
+        )
+        
         # Control Buttons
         button_frame = ttk.Frame(main_frame)
         button_frame.grid(row=3, column=0, columnspan=2, pady=10)
@@ -193,6 +233,13 @@ class DocPostProcessorGUI:
         )
         self.clear_btn.pack(side=tk.LEFT, padx=5)
         
+        self.clear_cache_btn = ttk.Button(
+            button_frame, 
+            text="Clear Classification Cache", 
+            command=self.clear_classification_cache
+        )
+        self.clear_cache_btn.pack(side=tk.LEFT, padx=5)
+        
         # Progress
         self.progress = ttk.Progressbar(main_frame, mode='indeterminate')
         self.progress.grid(row=4, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=5)
@@ -242,19 +289,29 @@ class DocPostProcessorGUI:
         if self.use_llm_var.get():
             self.api_key_label.grid(row=5, column=0, sticky=tk.W, pady=5)
             self.api_key_entry.grid(row=5, column=1, columnspan=2, sticky=(tk.W, tk.E), pady=5, padx=(10, 0))
+            self.use_batch_api_check.grid(row=6, column=0, columnspan=3, sticky=tk.W, pady=5)
         else:
             self.api_key_label.grid_remove()
             self.api_key_entry.grid_remove()
+            self.use_batch_api_check.grid_remove()
     
-    def check_messages(self):
-        """Check for messages from processor thread."""
+    def check_messages(self, event=None):
+        """Handle all queued messages from the processor thread."""
+        # Log lines are written to the widget together rather than one by one
+        log_lines = []
         try:
             while True:
                 msg_type, data = self.message_queue.get_nowait()
                 
                 if msg_type == "log":
-                    self._log_to_widget(data["message"], data["level"])
-                elif msg_type == "status":
+                    log_lines.append(self._format_log_line(data["message"], data["level"]))
+                    continue
+                
+                # Keep log output ahead of whatever happens next
+                self._log_to_widget(log_lines)
+                log_lines = []
+                
+                if msg_type == "status":
                     self.status_var.set(data)
                 elif msg_type == "stats":
                     self._update_stats_widget(data)
@@ -265,16 +322,32 @@ class DocPostProcessorGUI:
                     
         except queue.Empty:
             pass
-        finally:
-            # Schedule next check
-            self.root.after(100, self.check_messages)
+        
+        self._log_to_widget(log_lines)
     
-    def _log_to_widget(self, message, level="INFO"):
-        """Add message to log widget (called on main thread)."""
+    def post_message(self, msg_type, data):
+        """Thread-safe: queue a message and wake the main thread to handle it."""
+        self.message_queue.put((msg_type, data))
+        try:
+            self.root.event_generate("<<QueueMessage>>", when="tail")
+        except (tk.TclError, RuntimeError):
+            # The window is gone; nothing is left to update
+            pass
+    
+    def _format_log_line(self, message, level="INFO"):
+        """Format a log message with its timestamp."""
         timestamp = datetime.now().strftime("%H:%M:%S")
-        formatted_message = f"[{timestamp}] {level}: {message}\n"
+        return f"[{timestamp}] {level}: {message}\n"
+    
+    def _log_to_widget(self, lines):
+        """Append formatted log lines to the log widget (called on main thread)."""
+        if not lines:
+            return
+        
+        self.log_text.insert(tk.END, "".join(lines))
         
-        self.log_text.insert(tk.END, formatted_message)
+        # Drop the oldest lines so the widget stays fast on long runs
+        self.log_text.delete("1.0", f"end-{self.MAX_LOG_LINES + 1}l linestart")
         self.log_text.see(tk.END)
     
     def _update_stats_widget(self, stats):
@@ -319,19 +392,35 @@ class DocPostProcessorGUI:
     
     def log(self, message, level="INFO"):
         """Thread-safe logging."""
-        self.message_queue.put(("log", {"message": message, "level": level}))
+        self.post_message("log", {"message": message, "level": level})
     
     def clear_log(self):
         """Clear the log text."""
         self.log_text.delete(1.0, tk.END)
     
+    def clear_classification_cache(self):
+        """Forget stored LLM classifications so every document is classified again."""
+        if not messagebox.askyesno("Clear Cache", "Remove all cached LLM classifications?"):
+            return
+        
+        cache = ClassificationCache()
+        try:
+            removed = cache.clear()
+        except Exception as e:
+            messagebox.showerror("Error", f"Could not clear classification cache:\n{e}")
+            return
+        finally:
+            cache.close()
+        
+        self.log(f"Cleared {removed} cached classifications from {cache.path}")
+    
     def update_status(self, message):
         """Thread-safe status update."""
-        self.message_queue.put(("status", message))
+        self.post_message("status", message)
     
     def update_stats(self, stats):
         """Thread-safe statistics update."""
-        self.message_queue.put(("stats", stats))
+        self.post_message("stats", stats)
     
     def start_processing(self):
         """Start the processing."""
@@ -372,10 +461,11 @@ class DocPostProcessorGUI:
         # Get processing options
         process_subfolders = self.process_subfolders_var.get()
         flatten_output = self.flatten_output_var.get()
+        use_batch_api = bool(api_key) and self.use_batch_api_var.get()
         
         self.processor_thread = threading.Thread(
             target=self.run_processor,
-            args=(input_dir, output_dir, api_key, process_subfolders, flatten_output)
+            args=(input_dir, output_dir, api_key, process_subfolders, flatten_output, use_batch_api)
         )
         self.processor_thread.daemon = True
         self.processor_thread.start()
@@ -387,7 +477,7 @@ class DocPostProcessorGUI:
             self.log("Stopping processor...", "WARNING")
             self.update_status("Stopping...")
     
-    def run_processor(self, input_dir, output_dir, api_key, process_subfolders, flatten_output):
+    def run_processor(self, input_dir, output_dir, api_key, process_subfolders, flatten_output, use_batch_api=False):
         """Run the processor in a separate thread."""
         try:
             self.log(f"Starting document post-processing", "INFO")
@@ -396,6 +486,7 @@ class DocPostProcessorGUI:
             self.log(f"Process subfolders: {'Yes' if process_subfolders else 'No'}", "INFO")
             self.log(f"Flatten output: {'Yes' if flatten_output else 'No'}", "INFO")
             self.log(f"Using LLM: {'Yes' if api_key else 'No'}", "INFO")
+            self.log(f"Using Batch API: {'Yes' if use_batch_api else 'No'}", "INFO")
             self.update_status("Processing documents...")
             
             # Create new event loop for thread
@@ -405,11 +496,14 @@ class DocPostProcessorGUI:
             # Create processor with custom logger
             processor = GUIProcessor(input_dir, output_dir, api_key, self, 
                                    process_subfolders=process_subfolders, 
-                                   flatten_output=flatten_output)
+                                   flatten_output=flatten_output,
+                                   max_concurrency=self.max_concurrency_var.get())
             
             # Set chunk parameters
             processor.structurer.chunk_size = self.chunk_size_var.get()
             processor.structurer.chunk_overlap = self.chunk_overlap_var.get()
+            processor.sorter.batch_size = self.batch_size_var.get()
+            processor.sorter.use_batch_api = use_batch_api
             
             # Run processor
             summary = loop.run_until_complete(processor.process_all_documents(
@@ -424,12 +518,12 @@ class DocPostProcessorGUI:
             self.update_status("Processing completed")
             
             # Send completion message
-            self.message_queue.put(("complete", summary))
+            self.post_message("complete", summary)
             
         except Exception as e:
             self.log(f"Error during processing: {str(e)}", "ERROR")
             self.update_status("Error occurred")
-            self.message_queue.put(("error", str(e)))
+            self.post_message("error", str(e))
             
         finally:
             loop.close()
@@ -438,11 +532,21 @@ class DocPostProcessorGUI:
 class GUIProcessor(DocumentPostProcessor):
     """Custom processor that logs to GUI."""
     
-    def __init__(self, input_dir, output_dir, api_key, gui, process_subfolders=True, flatten_output=True):
-        super().__init__(input_dir, output_dir, api_key)
+    def __init__(self, input_dir, output_dir, api_key, gui, process_subfolders=True, flatten_output=True,
+                 max_concurrency=None):
+        super().__init__(input_dir, output_dir, api_key, max_concurrency=max_concurrency)
         self.gui = gui
         self.process_subfolders = process_subfolders
         self.flatten_output = flatten_output
+        self.completed_count = 0
+        
+        # Batch API progress goes to the GUI log and status bar
+        self.sorter.on_status = self._report_sorter_status
+    
+    def _report_sorter_status(self, message):
+        """Forward sorter progress messages to the GUI."""
+        self.gui.log(message)
+        self.gui.update_status(message)
     
     async def process_document(self, file_path):
         """Override to add GUI logging."""
@@ -453,8 +557,11 @@ class GUIProcessor(DocumentPostProcessor):
         result = await super().process_document(file_path)
         
         if result:
+            # Documents complete concurrently, so count them here rather than
+            # reading processed_docs, which is filled once all have finished
+            self.completed_count += 1
             self.gui.log(f"✓ Processed: {result.title} ({len(result.chunks)} chunks)")
-            self.gui.update_status(f"Processed {len(self.processed_docs)} documents")
+            self.gui.update_status(f"Processed {self.completed_count} documents")
         else:
             self.gui.log(f"✗ Skipped: {file_path.name} (no content)", "WARNING")
         
@@ -24,6 +24,13 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Non-documentation URLs, matched against the lowercased URL
+SKIP_URL_RE = re.compile(
+    r'/api/|/login|/signup|/auth/|\.pdf$|\.zip$|\.tar\.gz$|#|mailto:|javascript:|/download/|/releases/download/'
+)
+UNSAFE_FILENAME_CHARS_RE = re.compile(r'[^\w\-_\.]')
+REPEATED_UNDERSCORES_RE = re.compile(r'_+')
+
 
 class DocumentationScraper:
     """Scrapes documentation websites and saves content as markdown files."""
@@ -47,16 +54,8 @@ class DocumentationScraper:
             return False
             
         # Skip non-documentation URLs
-        skip_patterns = [
-            r'/api/', r'/login', r'/signup', r'/auth/', 
-            r'\.pdf$', r'\.zip$', r'\.tar\.gz$',
-            r'#', r'mailto:', r'javascript:', 
-            r'/download/', r'/releases/download/'
-        ]
-        
-        for pattern in skip_patterns:
-            if re.search(pattern, url.lower()):
-                return False
+        if SKIP_URL_RE.search(url.lower()):
+            return False
                 
         return True
     
@@ -69,8 +68,8 @@ class DocumentationScraper:
             path = "index"
             
         # Replace special characters
-        filename = re.sub(r'[^\w\-_\.]', '_', path)
-        filename = re.sub(r'_+', '_', filename)
+        filename = UNSAFE_FILENAME_CHARS_RE.sub('_', path)
+        filename = REPEATED_UNDERSCORES_RE.sub('_', filename)
         
         if not filename.endswith('.md'):
             filename += '.md'
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+OpenAI Batch API Client
+Submits chat completion requests through the /v1/batches endpoint and collects the results.
+"""
+
+import asyncio
+import json
+import logging
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Batch statuses that will never reach 'completed'
+FAILED_STATUSES = {'failed', 'expired', 'cancelled'}
+
+
+async def submit_batch(client, requests: List[Dict[str, Any]]) -> str:
+    """Upload requests as a JSONL file and start a batch job, returning its ID.
+    
+    Args:
+        client: An AsyncOpenAI client
+        requests: Batch request lines, each with custom_id, method, url and body
+    """
+    payload = ''.join(json.dumps(request) + '\n' for request in requests).encode('utf-8')
+    
+    batch_file = await client.files.create(
+        file=('batch_requests.jsonl', payload),
+        purpose='batch'
+    )
+    batch = await client.batches.create(
+        input_file_id=batch_file.id,
+        endpoint='/v1/chat/completions',
+        completion_window='24h'
+    )
+    
+    return batch.id
+
+
+async def await_batch(client, batch_id: str, poll_interval: float = 10.0, max_interval: float = 300.0,
+                      on_status: Optional[Callable[[Any], None]] = None) -> Dict[str, Dict[str, Any]]:
+    """Poll a batch until it finishes and return successful response bodies keyed by custom_id.
+    
+    Args:
+        client: An AsyncOpenAI client
+        batch_id: ID returned by submit_batch
+        poll_interval: Initial delay between status checks, doubled after each check
+        max_interval: Upper bound for the delay between status checks
+        on_status: Called with the batch object after every status check
+    """
+    interval = poll_interval
+    while True:
+        batch = await client.batches.retrieve(batch_id)
+        if on_status:
+            on_status(batch)
+        
+        if batch.status == 'completed':
+            break
+        if batch.status in FAILED_STATUSES:
+            raise RuntimeError(f"Batch {batch_id} ended with status '{batch.status}'")
+        
+        await asyncio.sleep(interval)
+        interval = min(interval * 2, max_interval)
+    
+    results = {}
+    if batch.output_file_id:
+        output = await client.files.content(batch.output_file_id)
+        for line in output.text.splitlines():
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            response = record.get('response') or {}
+            if response.get('status_code') == 200:
+                results[record['custom_id']] = response['body']
+            else:
+                logger.warning(f"Batch request {record.get('custom_id')} failed: {record.get('error')}")
+    
+    return results
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Classification Cache
+Persists LLM document classifications in SQLite so unchanged documents are not sent again.
+"""
+
+import logging
+import sqlite3
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Shared by every output directory, like other per-user caches
+DEFAULT_CACHE_PATH = Path.home() / '.cache' / 'docpostproc' / 'classify.sqlite'
+
+
+class ClassificationCache:
+    """Maps classification input hashes to categories."""
+    
+    def __init__(self, path: Path = DEFAULT_CACHE_PATH):
+        self.path = Path(path)
+        self._conn: Optional[sqlite3.Connection] = None
+    
+    def _connect(self) -> sqlite3.Connection:
+        """Open the database on first use, creating it if needed."""
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.path))
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS classifications (hash TEXT PRIMARY KEY, category TEXT NOT NULL)'
+            )
+        return self._conn
+    
+    def get_many(self, keys: List[str]) -> Dict[str, str]:
+        """Return the cached category for each known key."""
+        found = {}
+        try:
+            conn = self._connect()
+            # Stay well below SQLite's bound parameter limit
+            for i in range(0, len(keys), 500):
+                batch = keys[i:i + 500]
+                placeholders = ','.join('?' * len(batch))
+                found.update(conn.execute(
+                    f'SELECT hash, category FROM classifications WHERE hash IN ({placeholders})', batch
+                ))
+        except (sqlite3.Error, OSError) as e:
+            logger.warning(f"Could not read classification cache {self.path}: {e}")
+        return found
+    
+    def put_many(self, items: Iterable[Tuple[str, str]]) -> None:
+        """Store (key, category) pairs, replacing existing entries."""
+        try:
+            conn = self._connect()
+            with conn:
+                conn.executemany('INSERT OR REPLACE INTO classifications (hash, category) VALUES (?, ?)', items)
+        except (sqlite3.Error, OSError) as e:
+            logger.warning(f"Could not update classification cache {self.path}: {e}")
+    
+    def clear(self) -> int:
+        """Remove every cached classification and return how many there were."""
+        conn = self._connect()
+        with conn:
+            return conn.execute('DELETE FROM classifications').rowcount
+    
+    def close(self) -> None:
+        """Close the database connection if it is open."""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
@@ -4,6 +4,7 @@
 import asyncio
 import json
 import logging
+import mmap
 import os
 import sys
 import uuid
@@ -22,6 +23,12 @@ except ImportError:
     # Fallback if models can't be imported
     logger.warning("Could not import agent observation models - agent features disabled")
 
+try:
+    import msgpack
+except ImportError:
+    # Optional; without it the JSON index is always used
+    msgpack = None
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -42,8 +49,16 @@ def load_vector_database():
         logger.error(f"Database index not found: {index_file}")
         return []
     
-    with open(index_file, 'r') as f:
-        chunks = json.load(f)
+    # Prefer the MessagePack copy written by build_vector_index.py when it is
+    # at least as new as the JSON index; it unpacks much faster than JSON parses
+    msgpack_file = Path(db_path) / "vector_db_index.msgpack"
+    if (msgpack is not None and msgpack_file.exists()
+            and msgpack_file.stat().st_mtime >= index_file.stat().st_mtime):
+        with open(msgpack_file, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            chunks = msgpack.unpackb(mm, raw=False)
+    else:
+        with open(index_file, 'r') as f:
+            chunks = json.load(f)
     
     logger.info(f"Loaded {len(chunks)} chunks from {db_path}")
     return chunks
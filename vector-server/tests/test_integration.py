@@ -86,6 +86,31 @@ class TestVectorDatabaseIntegration:
                 assert database[0]["chunk_id"] == "react_1"
                 assert database[1]["chunk_id"] == "claude_1"
     
+    def test_database_loading_prefers_fresh_msgpack_index(self):
+        """Test that an up-to-date MessagePack index is loaded instead of the JSON one."""
+        msgpack = pytest.importorskip("msgpack")
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            index_file = Path(temp_dir) / "vector_db_index.json"
+            msgpack_file = Path(temp_dir) / "vector_db_index.msgpack"
+
+            with open(index_file, 'w') as f:
+                json.dump([{"chunk_id": "json_1", "content": "From JSON", "metadata": {}}], f)
+            msgpack_file.write_bytes(msgpack.packb(
+                [{"chunk_id": "msgpack_1", "content": "From MessagePack", "metadata": {}}],
+                use_bin_type=True
+            ))
+
+            with patch.dict(os.environ, {'VECTOR_DB_PATH': temp_dir}):
+                # Fresh binary copy is used
+                os.utime(index_file, (1000, 1000))
+                os.utime(msgpack_file, (2000, 2000))
+                assert load_vector_database()[0]["chunk_id"] == "msgpack_1"
+
+                # Stale binary copy is ignored
+                os.utime(msgpack_file, (500, 500))
+                assert load_vector_database()[0]["chunk_id"] == "json_1"
+    
     def test_combined_search_traditional_and_observations(self):
         """Test searching across both traditional docs and agent observations."""
         # Clear existing data